@@ -0,0 +1,82 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 캐시 최대 항목 수와 유효 시간 (초)
+MAX_ENTRIES = 1000
+TTL = 6 * 3600
+
+_TRAILING_PUNCTUATION = re.compile(r'[\s?!.。？！~]+$')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query):
+    """공백, 대소문자, 끝 문장부호 차이를 없앤 질문 문자열을 반환하는 함수"""
+    text = unicodedata.normalize('NFKC', query).lower().strip()
+    text = _TRAILING_PUNCTUATION.sub('', text)
+    return _WHITESPACE.sub(' ', text)
+
+
+class AnswerCache:
+    """사업장별 반복 질문의 답변을 보관하는 TTL + LRU 캐시
+
+    키에 데이터셋의 문서 구성 버전이 포함되므로, 업로드/삭제로 버전이 바뀌면
+    이전 답변은 자동으로 조회되지 않습니다.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query, plant, dataset_id, version):
+        return (normalize_query(query), plant, dataset_id, version)
+
+    def get(self, key):
+        """캐시된 답변을 반환하는 함수 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self._ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, answer):
+        """답변을 캐시에 저장하는 함수"""
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_dataset(self, dataset_id):
+        """데이터셋의 답변을 모두 삭제하는 함수"""
+        with self._lock:
+            for key in [key for key in self._entries if key[2] == dataset_id]:
+                del self._entries[key]
+
+    def stats(self):
+        """적중/실패 횟수와 항목 수를 반환하는 함수"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+# 프로세스 전체에서 공유하는 답변 캐시
+answer_cache = AnswerCache()
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limit import RateLimiter
+from singleflight import SingleFlight
+
+# API URL 정의 (MIR_API_URL 환경 변수로 로컬 대역 서버 등에 연결 가능)
+API_URL = os.environ.get('MIR_API_URL', 'https://mir-api.52g.ai/v1').rstrip('/')
+
+# 엔드포인트별 (연결, 읽기) 타임아웃 (초)
+TIMEOUTS = {
+    'documents': (5, 30),
+    'chat': (5, 300),
+    # 스트리밍 응답은 이벤트 사이의 대기 시간에만 적용
+    'workflow_stream': (5, 300),
+    'upload': (5, 120),
+    'default': (5, 60),
+}
+
+# 업로드 응답 대기 시간 계산에 쓰는 최소 업로드 속도 (바이트/초)
+UPLOAD_MIN_BYTES_PER_SEC = 256 * 1024
+
+# 재시도 설정
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+
+# 동시에 들어온 같은 요청을 한 번의 호출로 합치는 메서드 (스트리밍 응답 제외)
+COALESCE_METHODS = frozenset(['GET'])
+
+# 커넥션 풀 크기
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+
+# 프로세스 전체에서 공유하는 요청 병합기
+request_flight = SingleFlight()
+
+# 프로세스 전체에서 공유하는 API 키별 요청 제한기 (채팅 > 문서 조회 > 대량 작업 순으로 처리)
+rate_limiter = RateLimiter()
+
+
+class ApiError(Exception):
+    """mir-api가 성공 이외의 상태 코드를 반환했을 때 발생하는 예외"""
+
+    def __init__(self, status_code, text):
+        super().__init__(f'상태 코드: {status_code}, 응답 내용: {text}')
+        self.status_code = status_code
+        self.text = text
+
+
+def check_response(response):
+    """200이 아닌 응답이면 ApiError를 발생시키는 함수"""
+    if response.status_code != 200:
+        raise ApiError(response.status_code, response.text)
+    return response
+
+
+def get_session():
+    """프로세스 전체에서 공유하는 keep-alive 세션을 반환하는 함수"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=0
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def auth_headers(api_key, content_type='application/json'):
+    """Bearer 인증 헤더를 만드는 함수"""
+    headers = {'Authorization': f'Bearer {api_key}'}
+    if content_type:
+        headers['Content-Type'] = content_type
+    return headers
+
+
+def api_url(path):
+    """API 경로를 전체 URL로 변환하는 함수"""
+    return f"{API_URL}/{path.lstrip('/')}"
+
+
+def upload_timeout(size):
+    """파일 크기에 비례하는 업로드용 (연결, 읽기) 타임아웃을 반환하는 함수"""
+    connect_timeout, read_timeout = TIMEOUTS['upload']
+    return (connect_timeout, max(read_timeout, read_timeout / 4 + size / UPLOAD_MIN_BYTES_PER_SEC))
+
+
+def _should_retry(method, status_code):
+    # POST는 서버가 요청을 거절한 429에 대해서만 재시도 (중복 생성 방지)
+    if status_code == 429:
+        return True
+    return method in IDEMPOTENT_METHODS and status_code in RETRY_STATUS
+
+
+def _backoff_delay(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return min(float(retry_after), BACKOFF_MAX)
+            except ValueError:
+                pass
+    delay = min(BACKOFF_BASE * (2 ** attempt), BACKOFF_MAX)
+    return delay * (0.5 + random.random() / 2)
+
+
+def _rewind(kwargs):
+    # 재시도 시 업로드 파일 포인터와 스트리밍 본문을 처음으로 되돌림
+    files = kwargs.get('files') or {}
+    for value in files.values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, 'seek'):
+            fileobj.seek(0)
+    data = kwargs.get('data')
+    if hasattr(data, 'seek'):
+        data.seek(0)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return str(value)
+
+
+def coalesce_key(method, url, api_key, headers=None, params=None):
+    """요청 병합에 쓰는 키 (메서드, URL, 파라미터, 헤더, API 키 해시)"""
+    # 같은 API 키로 보낸 요청끼리만 응답을 공유하고, 키 원문은 보관하지 않음
+    credential_scope = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return (method, url, _freeze(params or {}), _freeze(headers or {}), credential_scope)
+
+
+def request(method, path, api_key, endpoint='default', headers=None, retries=MAX_RETRIES, coalesce=True,
+            queue_callback=None, **kwargs):
+    """공유 세션으로 mir-api를 호출하고 429/5xx 응답은 백오프 후 재시도하는 함수
+
+    동시에 들어온 같은 GET 요청은 한 번만 호출하고 응답을 함께 사용합니다.
+    요청마다 API 키의 요청 제한기에서 차례를 받으며, 기다리는 동안
+    queue_callback(대기 순번)을 호출합니다 (차례가 오면 0).
+    """
+    method = method.upper()
+    url = path if path.startswith('http') else api_url(path)
+    if coalesce and method in COALESCE_METHODS and not kwargs.get('stream') and set(kwargs) <= {'params', 'timeout'}:
+        key = coalesce_key(method, url, api_key, headers, kwargs.get('params'))
+        return request_flight.do(
+            key,
+            lambda: request(method, url, api_key, endpoint, headers, retries, coalesce=False,
+                            queue_callback=queue_callback, **kwargs)
+        )
+
+    request_headers = auth_headers(api_key, content_type=None if 'files' in kwargs else 'application/json')
+    if headers:
+        request_headers.update(headers)
+    kwargs.setdefault('timeout', TIMEOUTS.get(endpoint, TIMEOUTS['default']))
+
+    session = get_session()
+    attempt = 0
+    while True:
+        rate_limiter.acquire(api_key, endpoint, queue_callback)
+        try:
+            response = session.request(method, url, headers=request_headers, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            # POST는 연결 자체가 실패한 경우에만 재시도
+            retryable = method in IDEMPOTENT_METHODS or isinstance(e, requests.exceptions.ConnectTimeout)
+            if attempt >= retries or not retryable:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+            _rewind(kwargs)
+            continue
+
+        if attempt < retries and _should_retry(method, response.status_code):
+            delay = _backoff_delay(attempt, response)
+            if response.status_code == 429:
+                # 같은 키를 쓰는 다른 요청도 함께 쉬도록 요청 제한기를 일시 정지
+                rate_limiter.pause(api_key, delay)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+            _rewind(kwargs)
+            continue
+        return response
+
+
+def get(path, api_key, **kwargs):
+    return request('GET', path, api_key, **kwargs)
+
+
+def post(path, api_key, **kwargs):
+    return request('POST', path, api_key, **kwargs)
+
+
+def delete(path, api_key, **kwargs):
+    return request('DELETE', path, api_key, **kwargs)
@@ -0,0 +1,309 @@
+"""mir-api 대역 서버를 이용한 종단 간 성능 측정
+
+측정 항목
+    sidebar    : main.py 첫 실행/재실행/사업장 전환 시간 (streamlit AppTest)
+    ttft       : 채팅 첫 토큰까지 걸리는 시간과 전체 답변 시간
+    ingestion  : 직접 업로드/전처리 모드의 파일 처리량
+    memory     : 세션 하나가 늘어날 때의 RSS 증가량
+
+실행: python benchmarks/bench.py [--only sidebar,ttft] [--json results.json]
+실제 mir-api 대신 mock_server.py를 같은 프로세스에서 띄우고, 임시 작업 디렉터리에
+secrets.toml과 캐시를 만들어 실행하므로 운영 데이터에 영향을 주지 않습니다.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from mock_server import MockConfig, start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(REPO_ROOT, 'main.py')
+
+PLANTS = ["GS반월열병합발전", "GS구미열병합발전", "GS동해전력", "GS포천그린에너지"]
+BENCH_USER = 'user-bench'
+
+SECRETS_TOML = """\
+API_KEY = "bench-chat-key"
+PREPROCESS_API_KEY = "bench-preprocess-key"
+KNOWLEDGE_API_KEY = "bench-knowledge-key"
+DATASET_ID = "bench-banwol"
+DATASET_ID_BANWOL = "bench-banwol"
+DATASET_ID_GUMI = "bench-gumi"
+DATASET_ID_DONGHAE = "bench-donghae"
+DATASET_ID_POCHEON = "bench-pocheon"
+"""
+
+BENCHMARKS = ('sidebar', 'ttft', 'ingestion', 'memory')
+
+
+class BenchFile(io.BytesIO):
+    """Streamlit UploadedFile처럼 name/size를 가진 메모리 파일"""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def rss_bytes():
+    """현재 프로세스의 RSS(바이트)를 반환하는 함수"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, q):
+    """nearest-rank 방식의 백분위수"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    """측정값 목록을 p50/p95/p99/max 요약으로 변환하는 함수 (밀리초)"""
+    return {
+        'n': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 1) if values else None,
+        'p95_ms': round(percentile(values, 95) * 1000, 1) if values else None,
+        'p99_ms': round(percentile(values, 99) * 1000, 1) if values else None,
+        'max_ms': round(max(values) * 1000, 1) if values else None,
+    }
+
+
+def prepare_workdir():
+    """secrets.toml과 캐시가 들어갈 임시 작업 디렉터리로 이동하는 함수
+
+    st.secrets는 streamlit import 시점의 작업 디렉터리를 기준으로 secrets.toml을 찾으므로
+    streamlit과 앱 모듈을 import하기 전에 호출해야 합니다.
+    """
+    workdir = tempfile.mkdtemp(prefix='genai-bench-')
+    os.makedirs(os.path.join(workdir, '.streamlit'))
+    with open(os.path.join(workdir, '.streamlit', 'secrets.toml'), 'w', encoding='utf-8') as f:
+        f.write(SECRETS_TOML)
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+    return workdir
+
+
+def random_text(size, rng):
+    words = ['보일러', '급수펌프', '압력', '온도', '점검', '절차', '밸브', '운전', '정지', '경보', '조치', '확인']
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(words) + (' ' if rng.random() > 0.1 else '\n')
+        parts.append(word)
+        length += len(word.encode('utf-8'))
+    return ''.join(parts)
+
+
+def bench_sidebar(app_test, reruns):
+    """첫 실행, 같은 화면 재실행, 사업장 전환 시간을 측정하는 함수"""
+    at = app_test.from_file(MAIN_SCRIPT, default_timeout=120)
+    started = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"main.py 실행 오류: {at.exception[0].value}")
+
+    warm = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - started)
+
+    switches = []
+    for plant in PLANTS[1:] + PLANTS[:1]:
+        started = time.perf_counter()
+        at.radio[0].set_value(plant).run()
+        switches.append(time.perf_counter() - started)
+
+    return {'cold_ms': round(cold * 1000, 1), 'rerun': summarize(warm), 'plant_switch': summarize(switches)}
+
+
+def bench_ttft(samples, concurrency):
+    """동시에 concurrency개씩 채팅 스트림을 열어 첫 토큰/전체 답변 시간을 측정하는 함수"""
+    import chat_engine
+
+    first_tokens = []
+    totals = []
+    remaining = samples
+    while remaining > 0:
+        batch = min(concurrency, remaining)
+        remaining -= batch
+        streams = [
+            chat_engine.start_chat('bench-chat-key', {
+                'query': f'보일러 점검 절차 {i}',
+                'response_mode': 'streaming',
+                'user': BENCH_USER,
+                'inputs': {'location': PLANTS[0]},
+                'conversation_id': None,
+            })
+            for i in range(batch)
+        ]
+        finished = {}
+        while len(finished) < len(streams):
+            for index, stream in enumerate(streams):
+                if stream.done and index not in finished:
+                    finished[index] = time.monotonic()
+            time.sleep(0.005)
+        for index, stream in enumerate(streams):
+            if stream.error:
+                raise RuntimeError(f"채팅 스트림 오류: {stream.error}")
+            first_tokens.append(stream.first_token_at - stream.started_at)
+            totals.append(finished[index] - stream.started_at)
+
+    return {'concurrency': concurrency, 'first_token': summarize(first_tokens), 'full_answer': summarize(totals)}
+
+
+def _wait_pipeline(pipeline):
+    while not pipeline.done():
+        time.sleep(0.01)
+
+
+def bench_ingestion(files, file_kb, rng):
+    """직접 업로드와 전처리 모드의 파일 처리량을 측정하는 함수"""
+    import workflow_jobs
+    from ingestion import IngestionPipeline
+
+    results = {}
+    total_mb = files * file_kb / 1024
+
+    # 직접 업로드: 파일 그대로 create_by_file
+    uploads = [BenchFile(f'bench_{i}.pdf', os.urandom(file_kb * 1024)) for i in range(files)]
+    started = time.perf_counter()
+    pipeline = IngestionPipeline(uploads, 'bench-banwol', False, BENCH_USER).start()
+    _wait_pipeline(pipeline)
+    elapsed = time.perf_counter() - started
+    failed = [job.error for job in pipeline.jobs if job.stage == 'failed']
+    results['direct'] = {
+        'seconds': round(elapsed, 2),
+        'files_per_s': round(files / elapsed, 2),
+        'mb_per_s': round(total_mb / elapsed, 2),
+        'failed': len(failed),
+    }
+
+    # 전처리 모드: 추출 → 워크플로우 작업 등록 → 백그라운드 워크플로우/업로드 완료까지
+    texts = [BenchFile(f'bench_{i}.txt', random_text(file_kb * 1024, rng).encode('utf-8')) for i in range(files)]
+    started = time.perf_counter()
+    pipeline = IngestionPipeline(texts, 'bench-banwol', True, BENCH_USER).start()
+    _wait_pipeline(pipeline)
+    submitted = time.perf_counter() - started
+    job_ids = [job.job_id for job in pipeline.jobs if job.job_id]
+    while True:
+        jobs = [workflow_jobs.load_job(BENCH_USER, job_id) for job_id in job_ids]
+        if all(job and job['status'] not in workflow_jobs.ACTIVE_STATUSES for job in jobs):
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    failed = [job.error for job in pipeline.jobs if job.stage == 'failed']
+    failed += [job.get('error') for job in jobs if job['status'] == 'failed']
+    results['preprocess'] = {
+        'submit_seconds': round(submitted, 2),
+        'seconds': round(elapsed, 2),
+        'files_per_s': round(files / elapsed, 2),
+        'mb_per_s': round(total_mb / elapsed, 2),
+        'failed': len(failed),
+    }
+    return results
+
+
+def bench_memory(app_test, sessions):
+    """AppTest 세션을 여러 개 유지하면서 세션당 RSS 증가량을 측정하는 함수"""
+    keep = []
+    # 모듈 import와 공유 캐시 적재 비용은 제외하도록 한 세션을 먼저 실행
+    app_test.from_file(MAIN_SCRIPT, default_timeout=120).run()
+    gc.collect()
+    before = rss_bytes()
+    for _ in range(sessions):
+        at = app_test.from_file(MAIN_SCRIPT, default_timeout=120)
+        at.run()
+        keep.append(at)
+    gc.collect()
+    after = rss_bytes()
+    return {
+        'sessions': sessions,
+        'rss_before_mb': round(before / 2 ** 20, 1),
+        'rss_after_mb': round(after / 2 ** 20, 1),
+        'per_session_kb': round((after - before) / sessions / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='mir-api 대역 서버를 이용한 종단 간 성능 측정')
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help=f"실행할 항목 ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--documents', type=int, default=1000, help='데이터셋별 문서 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='대역 서버 요청당 지연 (초)')
+    parser.add_argument('--token-rate', type=float, default=200.0, help='채팅 답변 토큰/초')
+    parser.add_argument('--answer-tokens', type=int, default=100)
+    parser.add_argument('--workflow-seconds', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--reruns', type=int, default=20, help='sidebar: 재실행 횟수')
+    parser.add_argument('--chat-samples', type=int, default=16, help='ttft: 측정할 답변 수')
+    parser.add_argument('--chat-concurrency', type=int, default=4, help='ttft: 동시 스트림 수')
+    parser.add_argument('--files', type=int, default=8, help='ingestion: 파일 수')
+    parser.add_argument('--file-kb', type=int, default=256, help='ingestion: 파일 크기 (KB)')
+    parser.add_argument('--sessions', type=int, default=10, help='memory: 유지할 세션 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    server = start_server(MockConfig(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        answer_tokens=args.answer_tokens,
+        workflow_seconds=args.workflow_seconds,
+        error_rate=args.error_rate,
+        documents=args.documents,
+        seed=args.seed,
+    ))
+    os.environ['MIR_API_URL'] = server.url
+    output_path = os.path.abspath(args.json) if args.json else None
+    workdir = prepare_workdir()
+
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(args.seed)
+    results = {'config': vars(args), 'workdir': workdir}
+    for name in selected:
+        started = time.perf_counter()
+        if name == 'sidebar':
+            results[name] = bench_sidebar(AppTest, args.reruns)
+        elif name == 'ttft':
+            results[name] = bench_ttft(args.chat_samples, args.chat_concurrency)
+        elif name == 'ingestion':
+            results[name] = bench_ingestion(args.files, args.file_kb, rng)
+        elif name == 'memory':
+            results[name] = bench_memory(AppTest, args.sessions)
+        print(f"[{name}] ({time.perf_counter() - started:.1f}초)")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+
+    results['upstream'] = server.state.stats()
+    print("[upstream]")
+    print(json.dumps(results['upstream'], ensure_ascii=False, indent=2))
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
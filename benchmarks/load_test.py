@@ -0,0 +1,295 @@
+"""여러 사용자 세션을 동시에 실행하는 Streamlit 앱 부하 테스트
+
+세션마다 streamlit AppTest로 main.py를 실제로 실행하면서 사업장 전환, 채팅 질문,
+문서 검색, 파일 업로드, 단순 재실행을 무작위로 반복합니다. 한 프로세스에서
+동시 세션 수를 늘려 가며 재실행 지연(p50/p95/p99), 처리량, 재실행당 업스트림
+요청 수, RSS 증가량을 보고합니다.
+
+실행: python benchmarks/load_test.py --sessions 5,10,20 --duration 60
+
+AppTest는 file_uploader 조작을 지원하지 않으므로, 업로드 동작은 업로드 폼과 같은
+IngestionPipeline을 세션 스레드에서 직접 실행한 뒤 화면을 다시 실행합니다.
+
+채팅과 업로드는 답변 생성/업로드가 끝날 때까지 기다리므로 재실행 지연(latency)에는
+포함하지 않고 동작별 결과(by_action)로만 보고합니다.
+
+측정값은 AppTest로 스크립트를 같은 프로세스에서 실행한 결과이며, 실제 서버의
+웹소켓 전송, 프런트엔드 렌더링, 세션 관리 비용은 포함하지 않습니다. 또한 동시
+실행을 위해 Streamlit의 Runtime.instance/exists와 스크립트 컴파일을 전역으로
+바꿔 둡니다 (pin_test_runtime 참고). 절대값보다는 변경 전후 비교와 동시 세션 수에
+따른 추세를 보는 용도로 사용하세요.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from bench import (
+    MAIN_SCRIPT,
+    PLANTS,
+    BenchFile,
+    prepare_workdir,
+    rss_bytes,
+    summarize,
+)
+from mock_server import MockConfig, start_server
+
+# main.py의 USER_ID_PARAM과 같은 사용자 식별 쿼리 파라미터
+USER_ID_PARAM = 'uid'
+
+# 동작별 기본 비중
+DEFAULT_MIX = 'rerun=4,plant=2,search=3,chat=2,upload=1'
+
+# 화면 재실행 외에 답변 생성/업로드 완료까지 기다리는 동작 (재실행 지연 요약에서 제외)
+LONG_ACTIONS = frozenset(['chat', 'upload'])
+
+QUESTIONS = [
+    '보일러 급수펌프 점검 절차 알려줘',
+    '터빈 진동 경보가 발생하면 어떻게 조치해?',
+    '탈질설비 암모니아 주입량 기준은?',
+    '냉각탑 팬 정비 주기를 정리해줘',
+    '변압기 온도 상승 시 확인 사항은?',
+]
+SEARCHES = ['보일러', '터빈 매뉴얼', 'ㅂㅇㄹ', '정비', '급수', '점검 체크']
+
+# RSS 측정 주기 (초)
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+def parse_mix(text):
+    """'rerun=4,chat=2' 형식의 동작 비중을 (동작 목록, 비중 목록)으로 변환하는 함수"""
+    actions, weights = [], []
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        actions.append(name.strip())
+        weights.append(float(weight or 1))
+    return actions, weights
+
+
+class SessionResult:
+    """세션 하나의 동작별 지연 시간과 오류 기록"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = []
+
+
+def _run_session(index, app_test, args, deadline, result, start_barrier):
+    from ingestion import IngestionPipeline
+
+    rng = random.Random(args.seed + index)
+    actions, weights = parse_mix(args.mix)
+    at = app_test.from_file(MAIN_SCRIPT, default_timeout=args.timeout)
+    # 세션마다 다른 사용자로 실행 (브라우저처럼 URL의 uid로 전달하여 대화 저장소가 섞이지 않도록)
+    user_id = uuid.uuid4().hex
+    at.query_params[USER_ID_PARAM] = user_id
+    dataset_by_plant = {plant: f'bench-{key}' for plant, key in zip(PLANTS, ['banwol', 'gumi', 'donghae', 'pocheon'])}
+    plant = PLANTS[0]
+
+    def timed(action, step):
+        started = time.perf_counter()
+        try:
+            step()
+            if at.exception:
+                result.errors.append(f"{action}: {at.exception[0].value}")
+        except Exception as e:
+            result.errors.append(f"{action}: {e}")
+        result.latencies[action].append(time.perf_counter() - started)
+
+    start_barrier.wait()
+    timed('first_run', at.run)
+    while time.monotonic() < deadline:
+        action = rng.choices(actions, weights)[0]
+        if action == 'rerun':
+            timed(action, at.run)
+        elif action == 'plant':
+            plant = rng.choice(PLANTS)
+            timed(action, lambda: at.radio[0].set_value(plant).run())
+        elif action == 'search':
+            query = rng.choice(SEARCHES)
+            timed(action, lambda: at.text_input[0].set_value(query).run())
+            at.text_input[0].set_value('')
+        elif action == 'chat':
+            question = rng.choice(QUESTIONS)
+            timed(action, lambda: at.chat_input[0].set_value(question).run())
+        elif action == 'upload':
+            files = [BenchFile(f'load_{index}_{rng.getrandbits(32):08x}.pdf', os.urandom(args.upload_kb * 1024))]
+
+            def upload():
+                pipeline = IngestionPipeline(files, dataset_by_plant[plant], False, f'user-{user_id}').start()
+                while not pipeline.done():
+                    time.sleep(0.01)
+                at.run()
+
+            timed(action, upload)
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def pin_test_runtime():
+    """동시에 실행되는 AppTest 세션이 런타임을 잃지 않도록 고정하는 함수
+
+    AppTest는 실행할 때마다 전역 Runtime._instance를 설정하고 끝나면 None으로
+    되돌리므로, 다른 세션의 스크립트가 아직 실행 중이면 "Runtime hasn't been
+    created!" 오류로 스크립트 스레드가 죽고 해당 세션은 제한 시간까지 멈춥니다.
+    인스턴스가 비어 있을 때는 공유 대역 런타임을 반환하도록 바꿉니다.
+
+    또한 AppTest는 실행할 때마다 main.py를 다시 컴파일하는데, Python 3.11에서
+    여러 스레드가 동시에 ast.parse(매직 명령 처리)를 호출하면 간헐적으로
+    "AST constructor recursion depth mismatch" 오류가 나고 AppTest는 이를 예외 없이
+    빈 화면으로 반환합니다. 스크립트 컴파일은 한 번에 하나씩 실행되도록 묶습니다.
+    프로세스 전역을 바꾸므로 부하 테스트 프로세스에서만 호출해야 합니다.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def get_bytecode_serialized(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = get_bytecode_serialized
+
+
+def _sample_rss(stop, samples):
+    while not stop.is_set():
+        samples.append(rss_bytes())
+        stop.wait(RSS_SAMPLE_INTERVAL)
+
+
+def run_level(app_test, server, sessions, args):
+    """동시 세션 sessions개로 duration초 동안 부하를 주고 결과를 요약하는 함수"""
+    import api_client
+
+    with server.state.lock:
+        server.state.reset_stats()
+    shared_start = api_client.request_flight.stats()['shared']
+    rss_start = rss_bytes()
+    rss_samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_rss, args=(stop, rss_samples), daemon=True)
+    sampler.start()
+
+    results = [SessionResult() for _ in range(sessions)]
+    start_barrier = threading.Barrier(sessions)
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=_run_session, args=(i, app_test, args, deadline, results[i], start_barrier),
+                         name=f'load-session-{i}', daemon=True)
+        for i in range(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    by_action = defaultdict(list)
+    for result in results:
+        for action, values in result.latencies.items():
+            by_action[action].extend(values)
+    reruns = [value for action, values in by_action.items() if action not in LONG_ACTIONS for value in values]
+    actions = sum(len(values) for values in by_action.values())
+    upstream = server.state.stats()
+    errors = [error for result in results for error in result.errors]
+    return {
+        'sessions': sessions,
+        'seconds': round(elapsed, 1),
+        'actions': actions,
+        'actions_per_s': round(actions / elapsed, 2),
+        'reruns': len(reruns),
+        # 채팅/업로드를 제외한 화면 재실행 지연
+        'latency': summarize(reruns),
+        'by_action': {action: summarize(values) for action, values in sorted(by_action.items())},
+        'upstream_per_action': round(upstream['requests'] / actions, 2) if actions else None,
+        'upstream_by_route': {route: round(count / actions, 3) for route, count in upstream['by_route'].items()} if actions else {},
+        'coalesced_requests': api_client.request_flight.stats()['shared'] - shared_start,
+        'rss_start_mb': round(rss_start / 2 ** 20, 1),
+        'rss_peak_mb': round(max(rss_samples + [rss_start]) / 2 ** 20, 1),
+        'rss_end_mb': round(rss_bytes() / 2 ** 20, 1),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+    }
+
+
+def _print_table(levels):
+    header = (f"{'세션':>5} {'동작':>6} {'동작/s':>7} {'재실행':>6} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} "
+              f"{'채팅p95ms':>10} {'업로드p95ms':>11} {'요청/동작':>9} {'RSS MB':>14} {'오류':>5}")
+    print(header)
+    for level in levels:
+        latency = level['latency']
+        chat = level['by_action'].get('chat', {}).get('p95_ms')
+        upload = level['by_action'].get('upload', {}).get('p95_ms')
+        rss = f"{level['rss_start_mb']}→{level['rss_end_mb']}"
+        print(f"{level['sessions']:>5} {level['actions']:>6} {level['actions_per_s']:>7} {level['reruns']:>6} "
+              f"{latency['p50_ms']!s:>8} {latency['p95_ms']!s:>8} {latency['p99_ms']!s:>8} "
+              f"{chat!s:>10} {upload!s:>11} {level['upstream_per_action']!s:>9} {rss:>14} {level['errors']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 세션 동시 실행 부하 테스트')
+    parser.add_argument('--sessions', default='5,10,20', help='동시 세션 수 (쉼표로 여러 단계 지정)')
+    parser.add_argument('--duration', type=float, default=30.0, help='단계별 실행 시간 (초)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'동작 비중 (기본: {DEFAULT_MIX})')
+    parser.add_argument('--think-time', type=float, default=0.5, help='동작 사이 평균 대기 시간 (초)')
+    parser.add_argument('--upload-kb', type=int, default=512, help='업로드 파일 크기 (KB)')
+    parser.add_argument('--timeout', type=float, default=120.0, help='재실행 하나의 최대 시간 (초)')
+    parser.add_argument('--documents', type=int, default=1000, help='데이터셋별 문서 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='대역 서버 요청당 지연 (초)')
+    parser.add_argument('--token-rate', type=float, default=100.0, help='채팅 답변 토큰/초')
+    parser.add_argument('--answer-tokens', type=int, default=100)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='결과를 저장할 JSON 파일 경로')
+    args = parser.parse_args()
+
+    server = start_server(MockConfig(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate,
+        documents=args.documents,
+        seed=args.seed,
+    ))
+    os.environ['MIR_API_URL'] = server.url
+    output_path = os.path.abspath(args.json) if args.json else None
+    prepare_workdir()
+
+    from streamlit.testing.v1 import AppTest
+    pin_test_runtime()
+
+    levels = []
+    for sessions in [int(value) for value in args.sessions.split(',')]:
+        level = run_level(AppTest, server, sessions, args)
+        levels.append(level)
+        print(json.dumps(level, ensure_ascii=False, indent=2))
+    _print_table(levels)
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'levels': levels}, f, ensure_ascii=False, indent=2)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""로컬 성능 측정용 mir-api 대역 서버
+
+앱이 사용하는 엔드포인트만 흉내 냅니다.
+    POST   /v1/chat-messages                              (SSE 스트리밍 / blocking)
+    POST   /v1/workflows/run                              (SSE 스트리밍 / blocking)
+    GET    /v1/datasets/{id}/documents                    (page, limit 페이징)
+    DELETE /v1/datasets/{id}/documents/{document_id}
+    POST   /v1/datasets/{id}/document/create_by_text
+    POST   /v1/datasets/{id}/document/create_by_file
+    GET    /__stats, POST /__reset                        (요청 수 집계)
+
+실행: python benchmarks/mock_server.py --port 8765 --documents 1000
+앱 연결: MIR_API_URL=http://127.0.0.1:8765/v1 streamlit run main.py
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 문서 이름 생성용 단어
+EQUIPMENT = ['보일러', '터빈', '급수펌프', '복수기', '냉각탑', '발전기', '변압기', '탈질설비', '집진기', '배관']
+DOC_TYPES = ['운전 매뉴얼', '정비 지침서', '점검 체크리스트', '고장 조치 사례', '설치 도면 설명서']
+
+# 답변 토큰 생성용 문장
+ANSWER_WORDS = ['설비', '점검', '시', '압력', '온도', '를', '확인하고', '운전', '절차에', '따라', '조치합니다.']
+
+_FILENAME = re.compile(rb'filename="([^"]*)"')
+
+
+class MockConfig:
+    """대역 서버 동작 설정"""
+
+    def __init__(self, latency=0.05, token_rate=50.0, answer_tokens=200, workflow_seconds=1.0,
+                 error_rate=0.0, documents=1000, indexing_seconds=5.0, seed=None):
+        self.latency = latency                    # 모든 요청의 기본 응답 지연 (초)
+        self.token_rate = token_rate              # 채팅 답변 토큰 속도 (토큰/초, 0이면 지연 없음)
+        self.answer_tokens = answer_tokens        # 채팅 답변 토큰 수
+        self.workflow_seconds = workflow_seconds  # 워크플로우 한 번의 실행 시간 (초)
+        self.error_rate = error_rate              # 429/503 오류를 주입할 확률 (0~1)
+        self.documents = documents                # 데이터셋마다 미리 만들어 둘 문서 수
+        self.indexing_seconds = indexing_seconds  # 새 문서가 completed가 되기까지 걸리는 시간 (초)
+        self.random = random.Random(seed)
+
+
+class MockState:
+    """데이터셋 문서와 요청 통계를 보관하는 서버 상태"""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.datasets = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = Counter()
+        self.errors_injected = 0
+        self.bytes_received = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': sum(self.requests.values()),
+                'by_route': dict(self.requests),
+                'errors_injected': self.errors_injected,
+                'bytes_received': self.bytes_received,
+            }
+
+    def documents(self, dataset_id):
+        """데이터셋 문서를 최신순으로 반환 (처음 조회 시 생성)"""
+        docs = self.datasets.get(dataset_id)
+        if docs is None:
+            rng = random.Random(dataset_id)
+            now = int(time.time())
+            docs = self.datasets[dataset_id] = [
+                {
+                    'id': str(uuid.UUID(int=rng.getrandbits(128))),
+                    'name': f"{rng.choice(EQUIPMENT)} {rng.choice(DOC_TYPES)} {i:04d}.pdf",
+                    'created_at': now - (i + 1) * 60,
+                    'indexing_status': 'completed',
+                    'word_count': rng.randint(500, 50000),
+                    'ready_at': 0,
+                }
+                for i in range(self.config.documents)
+            ]
+        now = time.time()
+        for doc in docs:
+            if doc['indexing_status'] == 'indexing' and now >= doc['ready_at']:
+                doc['indexing_status'] = 'completed'
+        return docs
+
+    def add_document(self, dataset_id, name, word_count):
+        doc = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'created_at': int(time.time()),
+            'indexing_status': 'indexing',
+            'word_count': word_count,
+            'ready_at': time.time() + self.config.indexing_seconds,
+        }
+        self.documents(dataset_id).insert(0, doc)
+        return doc
+
+
+def _public(doc):
+    return {key: value for key, value in doc.items() if key != 'ready_at'}
+
+
+def _route(method, parts):
+    # 통계용 경로 이름 (데이터셋/문서 ID는 자리표시자로 바꿈)
+    if parts[0] == 'datasets' and len(parts) >= 3:
+        rest = parts[2:]
+        if rest[0] == 'documents' and len(rest) == 2:
+            rest = ['documents', '{document_id}']
+        return f"{method} /datasets/{{id}}/{'/'.join(rest)}"
+    return f"{method} /{'/'.join(parts)}"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # 응답 도우미
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _send_event(self, payload):
+        data = ('data: ' + json.dumps(payload, ensure_ascii=False) + '\n\n').encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _end_sse(self):
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        with self.state.lock:
+            self.state.bytes_received += len(body)
+        return body
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip('/')
+        state = self.state
+        config = state.config
+
+        if path == '/__stats' and method == 'GET':
+            return self._send_json(200, state.stats())
+        if path == '/__reset' and method == 'POST':
+            with state.lock:
+                state.reset_stats()
+            return self._send_json(200, {'result': 'success'})
+
+        if path.startswith('/v1'):
+            path = path[3:]
+        parts = path.strip('/').split('/')
+        route = _route(method, parts)
+        body = self._read_body() if method in ('POST', 'PUT') else b''
+
+        with state.lock:
+            state.requests[route] += 1
+            inject = config.error_rate and config.random.random() < config.error_rate
+            if inject:
+                state.errors_injected += 1
+        if config.latency:
+            time.sleep(config.latency)
+        if inject:
+            if config.random.random() < 0.5:
+                return self._send_json(429, {'message': 'rate limited'}, {'Retry-After': '1'})
+            return self._send_json(503, {'message': 'service unavailable'})
+
+        if method == 'POST' and parts == ['chat-messages']:
+            return self._chat(json.loads(body or b'{}'))
+        if method == 'POST' and parts == ['workflows', 'run']:
+            return self._workflow(json.loads(body or b'{}'))
+        if parts[0] == 'datasets' and len(parts) >= 3:
+            dataset_id = parts[1]
+            if method == 'GET' and parts[2:] == ['documents']:
+                return self._list_documents(dataset_id, parse_qs(parsed.query))
+            if method == 'DELETE' and parts[2] == 'documents' and len(parts) == 4:
+                return self._delete_document(dataset_id, parts[3])
+            if method == 'POST' and parts[2:] == ['document', 'create_by_text']:
+                payload = json.loads(body or b'{}')
+                return self._created(dataset_id, payload.get('name', 'untitled'), len(payload.get('text', '')))
+            if method == 'POST' and parts[2:] == ['document', 'create_by_file']:
+                match = _FILENAME.search(body[:4096])
+                name = match.group(1).decode('utf-8', 'replace') if match else 'upload'
+                return self._created(dataset_id, name, len(body) // 4)
+        return self._send_json(404, {'message': f'not found: {method} {path}'})
+
+    # 엔드포인트
+    def _chat(self, payload):
+        config = self.state.config
+        conversation_id = payload.get('conversation_id') or str(uuid.uuid4())
+        message_id = str(uuid.uuid4())
+        tokens = [ANSWER_WORDS[i % len(ANSWER_WORDS)] + ' ' for i in range(config.answer_tokens)]
+        if payload.get('response_mode') != 'streaming':
+            if config.token_rate:
+                time.sleep(len(tokens) / config.token_rate)
+            return self._send_json(200, {
+                'message_id': message_id,
+                'conversation_id': conversation_id,
+                'answer': ''.join(tokens),
+            })
+
+        self._start_sse()
+        delay = 1.0 / config.token_rate if config.token_rate else 0
+        for token in tokens:
+            self._send_event({'event': 'message', 'message_id': message_id,
+                              'conversation_id': conversation_id, 'answer': token})
+            if delay:
+                time.sleep(delay)
+        self._send_event({'event': 'message_end', 'message_id': message_id,
+                          'conversation_id': conversation_id, 'metadata': {}})
+        self._end_sse()
+
+    def _workflow(self, payload):
+        config = self.state.config
+        run_id = str(uuid.uuid4())
+        task_id = str(uuid.uuid4())
+        text = (payload.get('inputs') or {}).get('text', '')
+        data = {
+            'id': run_id,
+            'status': 'succeeded',
+            'outputs': {'result': f'https://mock.local/files/{run_id}.txt'},
+            'total_tokens': len(text) // 2,
+        }
+        if payload.get('response_mode') != 'streaming':
+            time.sleep(config.workflow_seconds)
+            return self._send_json(200, {'task_id': task_id, 'workflow_run_id': run_id, 'data': data})
+
+        self._start_sse()
+        self._send_event({'event': 'workflow_started', 'task_id': task_id, 'workflow_run_id': run_id,
+                          'data': {'id': run_id}})
+        for title in ('문서 정리', '표 변환'):
+            time.sleep(config.workflow_seconds / 2)
+            self._send_event({'event': 'node_finished', 'task_id': task_id, 'workflow_run_id': run_id,
+                              'data': {'title': title, 'status': 'succeeded'}})
+        self._send_event({'event': 'workflow_finished', 'task_id': task_id, 'workflow_run_id': run_id,
+                          'data': data})
+        self._end_sse()
+
+    def _list_documents(self, dataset_id, query):
+        page = max(1, int(query.get('page', ['1'])[0]))
+        limit = max(1, min(100, int(query.get('limit', ['20'])[0])))
+        with self.state.lock:
+            docs = self.state.documents(dataset_id)
+            start = (page - 1) * limit
+            data = [_public(doc) for doc in docs[start:start + limit]]
+            total = len(docs)
+        return self._send_json(200, {
+            'data': data,
+            'has_more': start + limit < total,
+            'limit': limit,
+            'total': total,
+            'page': page,
+        })
+
+    def _delete_document(self, dataset_id, document_id):
+        with self.state.lock:
+            docs = self.state.documents(dataset_id)
+            remaining = [doc for doc in docs if doc['id'] != document_id]
+            found = len(remaining) != len(docs)
+            docs[:] = remaining
+        if not found:
+            return self._send_json(404, {'message': 'document not found'})
+        return self._send_json(200, {'result': 'success'})
+
+    def _created(self, dataset_id, name, word_count):
+        with self.state.lock:
+            doc = self.state.add_document(dataset_id, name, word_count)
+        return self._send_json(200, {'document': _public(doc), 'batch': uuid.uuid4().hex})
+
+    def _handle(self, method):
+        try:
+            self._dispatch(method)
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트리밍 중에 연결을 끊은 경우 (답변 중지 등)
+            self.close_connection = True
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # keep-alive 연결을 클라이언트가 닫는 경우는 정상 동작이므로 기록하지 않음
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_server(config=None, host='127.0.0.1', port=0):
+    """대역 서버를 백그라운드 스레드에서 시작하고 서버 객체를 반환하는 함수
+
+    server.url은 MIR_API_URL에 넣을 주소(/v1 포함)이고 server.state로 통계를 볼 수 있습니다.
+    """
+    state = MockState(config or MockConfig())
+    handler = type('BoundMockHandler', (MockHandler,), {'state': state})
+    server = MockServer((host, port), handler)
+    server.state = state
+    server.url = f'http://{host}:{server.server_address[1]}/v1'
+    threading.Thread(target=server.serve_forever, name='mock-mir-api', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='mir-api 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='요청당 기본 지연 (초)')
+    parser.add_argument('--token-rate', type=float, default=50.0, help='채팅 답변 토큰/초 (0이면 지연 없음)')
+    parser.add_argument('--answer-tokens', type=int, default=200, help='채팅 답변 토큰 수')
+    parser.add_argument('--workflow-seconds', type=float, default=1.0, help='워크플로우 실행 시간 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='429/503 오류 주입 확률 (0~1)')
+    parser.add_argument('--documents', type=int, default=1000, help='데이터셋별 문서 수')
+    parser.add_argument('--indexing-seconds', type=float, default=5.0, help='새 문서 색인 완료까지 걸리는 시간 (초)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        answer_tokens=args.answer_tokens,
+        workflow_seconds=args.workflow_seconds,
+        error_rate=args.error_rate,
+        documents=args.documents,
+        indexing_seconds=args.indexing_seconds,
+        seed=args.seed,
+    )
+    server = start_server(config, args.host, args.port)
+    print(f"mir-api 대역 서버 실행 중: {server.url} (종료: Ctrl+C)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import api_client
+import sse
+
+# 프로세스 전체에서 동시에 열 수 있는 chat-messages 스트림 수
+MAX_CONCURRENT_STREAMS = 16
+
+_stream_slots = threading.BoundedSemaphore(MAX_CONCURRENT_STREAMS)
+
+
+class ChatStream:
+    """백그라운드 스레드에서 chat-messages 스트림을 읽어 답변 버퍼에 쌓는 객체
+
+    화면(스크립트)은 read()로 새로 도착한 답변만 가져가므로, 다른 위젯 조작으로
+    스크립트가 다시 실행되어도 답변 생성은 중단되지 않습니다.
+    """
+
+    def __init__(self, api_key, payload, on_finished=None):
+        self._api_key = api_key
+        self._payload = payload
+        self._on_finished = on_finished
+        self._lock = threading.Lock()
+        self._parts = []
+        self._length = 0
+        self._response = None
+        self._thread = threading.Thread(target=self._run, name='chat-stream', daemon=True)
+        self.status = 'waiting'
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self.end_payload = None
+        self.finalized = False
+        self.started_at = time.monotonic()
+        self.first_token_at = None
+        # on_finished에서 대화 저장소에 저장한 답변 메시지 (저장하지 않았으면 None)
+        self.saved_message = None
+        # API 요청 제한기 대기열에서의 순번 (기다리지 않으면 0)
+        self.queue_position = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _append(self, delta):
+        with self._lock:
+            if self.first_token_at is None:
+                self.first_token_at = time.monotonic()
+            self._parts.append(delta)
+            self._length += len(delta)
+
+    def _report_queue(self, position):
+        self.queue_position = position
+
+    def _run(self):
+        acquired = False
+        try:
+            # 동시 스트림 수 제한: 중지 요청을 확인하면서 빈 슬롯을 기다림
+            while not self.cancelled:
+                if _stream_slots.acquire(timeout=0.5):
+                    acquired = True
+                    break
+            if self.cancelled:
+                return
+
+            self.status = 'streaming'
+            response = api_client.post(
+                'chat-messages',
+                self._api_key,
+                endpoint='chat',
+                queue_callback=self._report_queue,
+                json=self._payload,
+                stream=True
+            )
+            self._response = response
+            if response.status_code != 200:
+                self.error = f"API 요청 실패: {response.status_code}"
+                return
+
+            for event, event_json in sse.iter_json_events(response):
+                if self.cancelled:
+                    break
+                if event in [sse.MESSAGE, sse.AGENT_MESSAGE]:
+                    self._append(event_json.get('answer', ''))
+                elif event == sse.MESSAGE_END:
+                    self.end_payload = event_json
+                    break
+                elif event == sse.ERROR:
+                    self.error = f"답변 생성 중 오류 발생: {event_json.get('message', '')}"
+                    break
+        except Exception as e:
+            # 중지 요청으로 연결을 닫은 경우의 예외는 무시
+            if not self.cancelled:
+                self.error = str(e)
+        finally:
+            if self._response is not None:
+                self._response.close()
+            if acquired:
+                _stream_slots.release()
+            # 화면(세션)이 닫혀도 답변이 남도록 완료 처리는 이 스레드에서 실행
+            if self._on_finished is not None:
+                try:
+                    self._on_finished(self)
+                except Exception as e:
+                    self.error = self.error or f"답변 저장 중 오류 발생: {e}"
+            self.status = 'cancelled' if self.cancelled else 'done'
+            self.done = True
+
+    def cancel(self):
+        """답변 생성을 중지하고 업스트림 연결을 즉시 닫는 함수"""
+        self.cancelled = True
+        response = self._response
+        if response is not None:
+            response.close()
+
+    def wait(self, timeout=None):
+        """답변 스레드(완료 처리 포함)가 끝날 때까지 기다리는 함수"""
+        self._thread.join(timeout)
+        return self.done
+
+    def read(self, offset=0):
+        """offset 이후에 도착한 답변과 새 offset을 반환하는 함수"""
+        with self._lock:
+            if offset >= self._length:
+                return '', offset
+            text = ''.join(self._parts)
+            # 다음 읽기를 위해 버퍼를 하나로 합쳐 둠
+            self._parts = [text]
+            return text[offset:], self._length
+
+    @property
+    def text(self):
+        """지금까지 받은 전체 답변"""
+        with self._lock:
+            return ''.join(self._parts)
+
+    @property
+    def conversation_id(self):
+        """API가 반환한 conversation_id (완료 전에는 None)"""
+        return (self.end_payload or {}).get('conversation_id')
+
+
+def start_chat(api_key, payload, on_finished=None):
+    """chat-messages 스트림을 백그라운드에서 시작하는 함수
+
+    on_finished(stream)는 답변이 끝나거나 중지/실패했을 때 답변 스레드에서 호출됩니다.
+    """
+    return ChatStream(api_key, payload, on_finished=on_finished).start()
+
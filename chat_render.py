@@ -0,0 +1,99 @@
+import html
+import time
+from functools import lru_cache
+
+# 스트리밍 답변 화면 갱신 조건: 마지막 갱신 후 이 시간(초)이 지났거나 이만큼 글자가 쌓였을 때
+FRAME_INTERVAL = 0.08
+FRAME_CHARS = 200
+
+# 말풍선 HTML을 보관할 메시지 수 (프로세스 전체 공유)
+MESSAGE_HTML_CACHE_SIZE = 4096
+
+
+def user_message_html(escaped_message, timestamp):
+    """이스케이프된 사용자 메시지를 말풍선 HTML로 만드는 함수"""
+    return f"""
+    <div class="message user-message">
+        <div class="message-content">
+            <div class="avatar">🧑</div>
+            <div class="text">{escaped_message}</div>
+        </div>
+        <div class="message-timestamp">{timestamp}</div>
+    </div>
+    """
+
+
+def agent_message_html(escaped_message, timestamp):
+    """이스케이프된 에이전트 메시지를 말풍선 HTML로 만드는 함수"""
+    return f"""
+    <div class="message agent-message">
+        <div class="message-content">
+            <div class="avatar">🤖</div>
+            <div class="text">{escaped_message}</div>
+        </div>
+        <div class="message-timestamp">{timestamp}</div>
+    </div>
+    """
+
+
+@lru_cache(maxsize=MESSAGE_HTML_CACHE_SIZE)
+def message_html(role, message, timestamp):
+    """저장된 메시지의 말풍선 HTML을 반환하는 함수 (이스케이프 결과를 캐시)"""
+    escaped_message = html.escape(message)
+    if role == 'user':
+        return user_message_html(escaped_message, timestamp).strip()
+    return agent_message_html(escaped_message, timestamp).strip()
+
+
+def history_html(messages):
+    """여러 메시지를 한 번에 그릴 수 있도록 말풍선 HTML을 이어 붙이는 함수"""
+    return '\n'.join(
+        message_html(message['role'], message['message'], message['timestamp'])
+        for message in messages
+    )
+
+
+class StreamRenderer:
+    """스트리밍 토큰을 프레임 단위로 모아 placeholder에 그리는 렌더러
+
+    새로 들어온 토큰만 이스케이프하고, 일정 시간 또는 글자 수가 쌓였을 때만
+    화면을 갱신하여 토큰마다 전체 답변을 다시 보내지 않습니다.
+    """
+
+    def __init__(self, placeholder, timestamp, frame_interval=FRAME_INTERVAL, frame_chars=FRAME_CHARS):
+        self._placeholder = placeholder
+        self._timestamp = timestamp
+        self._frame_interval = frame_interval
+        self._frame_chars = frame_chars
+        self._raw_parts = []
+        self._escaped = ''
+        self._pending = []
+        self._pending_chars = 0
+        self._last_flush = 0.0
+
+    @property
+    def text(self):
+        """지금까지 받은 원문 답변"""
+        return ''.join(self._raw_parts)
+
+    def feed(self, delta):
+        """토큰을 추가하고 프레임 조건을 만족하면 화면을 갱신하는 함수"""
+        if not delta:
+            return
+        self._raw_parts.append(delta)
+        # HTML 이스케이프는 문자 단위이므로 새 토큰만 이스케이프해도 결과가 같음
+        self._pending.append(html.escape(delta))
+        self._pending_chars += len(delta)
+        if (self._pending_chars >= self._frame_chars
+                or time.monotonic() - self._last_flush >= self._frame_interval):
+            self.flush()
+
+    def flush(self):
+        """쌓인 토큰을 즉시 화면에 반영하는 함수"""
+        if not self._pending:
+            return
+        self._escaped += ''.join(self._pending)
+        self._pending = []
+        self._pending_chars = 0
+        self._placeholder.markdown(agent_message_html(self._escaped, self._timestamp), unsafe_allow_html=True)
+        self._last_flush = time.monotonic()
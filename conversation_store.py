@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# 대화 저장 DB 경로 (환경 변수로 변경 가능)
+DB_PATH = os.environ.get('CONVERSATION_DB_PATH', os.path.join('.cache', 'conversations.db'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    plant TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    api_conversation_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_user_plant
+    ON conversations (user_id, plant, updated_at DESC);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL REFERENCES conversations (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation
+    ON messages (conversation_id, id);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    # 스레드마다 별도 연결 사용 (Streamlit은 세션마다 다른 스레드에서 스크립트 실행)
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        global _initialized
+        directory = os.path.dirname(DB_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(_SCHEMA)
+                _initialized = True
+        _local.conn = conn
+    return conn
+
+
+def create_conversation(user_id, plant, title="새 대화", date=None):
+    """새 대화를 만들고 반환하는 함수"""
+    now = time.time()
+    conversation = {
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'plant': plant,
+        'title': title,
+        'date': date or time.strftime('%Y-%m-%d'),
+        'created_at': now,
+        'updated_at': now,
+        'message_count': 0,
+        'api_conversation_id': None,
+    }
+    _connect().execute(
+        'INSERT INTO conversations (id, user_id, plant, title, date, created_at, updated_at, message_count) '
+        'VALUES (:id, :user_id, :plant, :title, :date, :created_at, :updated_at, :message_count)',
+        conversation
+    )
+    return conversation
+
+
+def get_conversation(conversation_id):
+    """대화 정보를 반환하는 함수 (없으면 None)"""
+    row = _connect().execute('SELECT * FROM conversations WHERE id = ?', (conversation_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def list_conversations(user_id, plant, limit=5):
+    """사용자의 사업장별 최근 대화 목록을 반환하는 함수"""
+    rows = _connect().execute(
+        'SELECT * FROM conversations WHERE user_id = ? AND plant = ? ORDER BY updated_at DESC LIMIT ?',
+        (user_id, plant, limit)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def delete_conversation(conversation_id):
+    """대화와 메시지를 삭제하는 함수"""
+    _connect().execute('DELETE FROM conversations WHERE id = ?', (conversation_id,))
+
+
+def set_api_conversation_id(conversation_id, api_conversation_id):
+    """API가 발급한 conversation_id를 대화에 저장하는 함수"""
+    _connect().execute(
+        'UPDATE conversations SET api_conversation_id = ? WHERE id = ?',
+        (api_conversation_id, conversation_id)
+    )
+
+
+def append_message(conversation_id, role, message, timestamp):
+    """대화에 메시지 한 건을 추가하고 저장된 메시지를 반환하는 함수"""
+    conn = _connect()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = conn.execute(
+            'INSERT INTO messages (conversation_id, role, message, timestamp) VALUES (?, ?, ?, ?)',
+            (conversation_id, role, message, timestamp)
+        )
+        conn.execute(
+            'UPDATE conversations SET message_count = message_count + 1, updated_at = ? WHERE id = ?',
+            (time.time(), conversation_id)
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return {'id': cursor.lastrowid, 'role': role, 'message': message, 'timestamp': timestamp}
+
+
+def load_messages(conversation_id, limit=20, before_id=None):
+    """대화의 메시지를 최신 limit개까지 오래된 순서로 반환하는 함수
+
+    before_id를 지정하면 해당 메시지보다 이전 메시지를 조회합니다.
+    """
+    if before_id is None:
+        rows = _connect().execute(
+            'SELECT id, role, message, timestamp FROM messages WHERE conversation_id = ? '
+            'ORDER BY id DESC LIMIT ?',
+            (conversation_id, limit)
+        ).fetchall()
+    else:
+        rows = _connect().execute(
+            'SELECT id, role, message, timestamp FROM messages WHERE conversation_id = ? AND id < ? '
+            'ORDER BY id DESC LIMIT ?',
+            (conversation_id, before_id, limit)
+        ).fetchall()
+    return [dict(row) for row in reversed(rows)]
@@ -0,0 +1,122 @@
+import threading
+import time
+
+# 캐시 유효 시간 (초)
+DEFAULT_TTL = 60
+
+
+class _Entry:
+    __slots__ = ('documents', 'fetched_at', 'stale', 'refreshing', 'error')
+
+    def __init__(self):
+        self.documents = None
+        self.fetched_at = 0.0
+        self.stale = True
+        self.refreshing = False
+        self.error = None
+
+
+class DocumentCache:
+    """dataset_id별 문서 리스트를 프로세스 전체에서 공유하는 TTL + 무효화 캐시
+
+    TTL이 지난 항목은 기존 데이터를 그대로 반환하면서 백그라운드에서 갱신하고,
+    업로드/삭제로 무효화된 항목은 다음 조회 시 동기적으로 다시 가져옵니다.
+    """
+
+    def __init__(self, loader, ttl=DEFAULT_TTL):
+        self._loader = loader
+        self._ttl = ttl
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._listeners = []
+
+    def _entry(self, dataset_id):
+        entry = self._entries.get(dataset_id)
+        if entry is None:
+            entry = self._entries[dataset_id] = _Entry()
+            self._fetch_locks[dataset_id] = threading.Lock()
+        return entry
+
+    def _load(self, dataset_id, entry):
+        with self._lock:
+            version = self._versions.get(dataset_id, 0)
+        documents = self._loader(dataset_id)
+        with self._lock:
+            # 조회 중에 무효화되었으면 변경 전 리스트일 수 있으므로 저장하지 않음
+            if self._versions.get(dataset_id, 0) == version:
+                entry.documents = documents
+                entry.fetched_at = time.monotonic()
+                entry.stale = False
+                entry.error = None
+        return documents
+
+    def _refresh_in_background(self, dataset_id, entry):
+        def run():
+            try:
+                self._load(dataset_id, entry)
+            except Exception as e:
+                # 갱신 실패 시 기존 데이터를 유지
+                with self._lock:
+                    entry.error = e
+            finally:
+                with self._lock:
+                    entry.refreshing = False
+
+        threading.Thread(target=run, name=f'doc-cache-{dataset_id}', daemon=True).start()
+
+    def get(self, dataset_id):
+        """created_at 역순으로 정렬된 문서 리스트를 반환하는 함수"""
+        with self._lock:
+            entry = self._entry(dataset_id)
+            fetch_lock = self._fetch_locks[dataset_id]
+            documents = entry.documents
+            expired = time.monotonic() - entry.fetched_at > self._ttl
+            if documents is not None and not entry.stale:
+                if expired and not entry.refreshing:
+                    entry.refreshing = True
+                    self._refresh_in_background(dataset_id, entry)
+                return documents
+
+        # 캐시가 없거나 무효화된 경우 동기 조회 (동시 요청은 한 번만 조회)
+        with fetch_lock:
+            with self._lock:
+                if entry.documents is not None and not entry.stale:
+                    return entry.documents
+            return self._load(dataset_id, entry)
+
+    def patch(self, dataset_id, updates, bump_version=False):
+        """캐시된 문서 중 id가 updates에 있는 문서만 새 정보로 교체하는 함수
+
+        다른 세션이 읽고 있는 리스트는 그대로 두고 새 리스트로 바꿉니다.
+        bump_version이면 무효화와 같이 버전을 올리고 리스너를 호출합니다.
+        """
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None and entry.documents is not None:
+                entry.documents = [updates.get(doc['id'], doc) for doc in entry.documents]
+            if bump_version:
+                self._versions[dataset_id] = self._versions.get(dataset_id, 0) + 1
+        if bump_version:
+            for callback in self._listeners:
+                callback(dataset_id)
+
+    def add_listener(self, callback):
+        """무효화될 때 callback(dataset_id)을 호출하도록 등록하는 함수"""
+        self._listeners.append(callback)
+
+    def invalidate(self, dataset_id):
+        """데이터셋이 변경되었을 때 캐시를 무효화하는 함수"""
+        with self._lock:
+            entry = self._entries.get(dataset_id)
+            if entry is not None:
+                entry.stale = True
+            self._versions[dataset_id] = self._versions.get(dataset_id, 0) + 1
+        for callback in self._listeners:
+            callback(dataset_id)
+
+    def version(self, dataset_id):
+        """데이터셋의 문서 구성이 바뀔 때마다 증가하는 버전을 반환하는 함수"""
+        with self._lock:
+            return self._versions.get(dataset_id, 0)
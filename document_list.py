@@ -1,25 +1,33 @@
 import streamlit as st
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+import api_client
+import document_search
+import instrumentation
+from answer_cache import answer_cache
+from document_cache import DocumentCache
+from indexing_tracker import IndexingTracker
 
 # API 키 설정
 KNOWLEDGE_API_KEY = st.secrets["KNOWLEDGE_API_KEY"]
 
+# 페이지 조회 설정
+PAGE_SIZE = 100
+MAX_IN_FLIGHT_PAGES = 4
+
 def get_document_list(dataset_id, page=1, limit=20):
     """지식 데이터셋의 문서 리스트를 조회하는 함수"""
     try:
-        headers = {
-            'Authorization': f'Bearer {KNOWLEDGE_API_KEY}'
-        }
-        
         params = {
             'page': page,
             'limit': limit
         }
         
-        response = requests.get(
-            f'https://mir-api.52g.ai/v1/datasets/{dataset_id}/documents',
-            headers=headers,
+        response = api_client.get(
+            f'datasets/{dataset_id}/documents',
+            KNOWLEDGE_API_KEY,
+            endpoint='documents',
             params=params
         )
         
@@ -33,19 +41,101 @@ def get_document_list(dataset_id, page=1, limit=20):
         st.error(f"문서 리스트 조회 중 오류 발생: {str(e)}")
         return None
 
+def _fetch_page(dataset_id, page, limit):
+    started = time.perf_counter()
+    response = api_client.get(
+        f'datasets/{dataset_id}/documents',
+        KNOWLEDGE_API_KEY,
+        endpoint='documents',
+        params={'page': page, 'limit': limit}
+    )
+    response.raise_for_status()
+    result = response.json()
+    # 페이지별 조회 시간은 계측 패널/메트릭으로 확인 (계측이 꺼져 있으면 기록하지 않음)
+    instrumentation.observe('documents.page', time.perf_counter() - started, dataset=dataset_id)
+    return result
+
+def iter_documents(dataset_id, page_size=PAGE_SIZE, max_in_flight=MAX_IN_FLIGHT_PAGES):
+    """모든 페이지를 동시에 조회하며 도착하는 순서대로 문서를 반환하는 제너레이터
+
+    첫 페이지로 전체 문서 수를 확인한 뒤 나머지 페이지를 최대 max_in_flight개까지
+    동시에 요청합니다. 제너레이터가 닫히면 남은 요청을 취소합니다.
+    """
+    first = _fetch_page(dataset_id, 1, page_size)
+    yield from first.get('data', [])
+
+    total = first.get('total') or 0
+    last_page = (total - 1) // page_size + 1 if total else 1
+    if last_page <= 1 and first.get('has_more'):
+        # total이 없는 응답은 has_more가 False가 될 때까지 순차 조회
+        page = 2
+        while True:
+            result = _fetch_page(dataset_id, page, page_size)
+            yield from result.get('data', [])
+            if not result.get('has_more'):
+                break
+            page += 1
+        return
+
+    pages = iter(range(2, last_page + 1))
+    executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='doc-pages')
+    in_flight = set()
+    try:
+        for page in pages:
+            in_flight.add(executor.submit(_fetch_page, dataset_id, page, page_size))
+            if len(in_flight) >= max_in_flight:
+                break
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result().get('data', [])
+                next_page = next(pages, None)
+                if next_page is not None:
+                    in_flight.add(executor.submit(_fetch_page, dataset_id, next_page, page_size))
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def fetch_documents(dataset_id):
+    """데이터셋의 전체 문서를 created_at 역순으로 조회하는 함수 (실패 시 예외 발생)"""
+    with instrumentation.span('documents.fetch', dataset=dataset_id):
+        documents = list(iter_documents(dataset_id))
+    with instrumentation.span('documents.sort', dataset=dataset_id):
+        documents.sort(key=lambda x: x['created_at'], reverse=True)
+    # 첫 검색 입력 때 색인을 만들지 않도록 조회할 때(백그라운드 갱신 포함) 미리 색인
+    with instrumentation.span('documents.index', dataset=dataset_id):
+        document_search.get_index(dataset_id).build(documents)
+    return documents
+
+# 세션 간에 공유되는 문서 리스트 캐시 (변경 시 해당 데이터셋의 답변 캐시도 삭제)
+document_cache = DocumentCache(fetch_documents)
+document_cache.add_listener(answer_cache.invalidate_dataset)
+
+def fetch_recent_documents(dataset_id, limit):
+    """최근 생성된 문서 limit개를 한 번의 요청으로 조회하는 함수 (실패 시 예외 발생)"""
+    return _fetch_page(dataset_id, 1, limit).get('data', [])
+
+# 색인 중인 문서의 상태만 확인해 문서 캐시에 반영하는 추적기
+indexing_tracker = IndexingTracker(document_cache, fetch_recent_documents)
+
+def get_cached_documents(dataset_id):
+    """캐시된 문서 리스트를 반환하는 함수 (색인 중인 문서는 상태 추적 시작)"""
+    documents = document_cache.get(dataset_id)
+    indexing_tracker.track(dataset_id, documents)
+    return documents
+
 def delete_document(dataset_id, document_id):
     """문서를 삭제하는 함수"""
     try:
-        headers = {
-            'Authorization': f'Bearer {KNOWLEDGE_API_KEY}'
-        }
-        
-        response = requests.delete(
-            f'https://mir-api.52g.ai/v1/datasets/{dataset_id}/documents/{document_id}',
-            headers=headers
+        response = api_client.delete(
+            f'datasets/{dataset_id}/documents/{document_id}',
+            KNOWLEDGE_API_KEY,
+            endpoint='documents'
         )
         
         if response.status_code == 200:
+            document_cache.invalidate(dataset_id)
             return True
         else:
             st.error(f"문서 삭제 실패: {response.text}")
@@ -0,0 +1,262 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+
+# 한글 초성 목록 (유니코드 자모 순서)
+CHOSUNG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+]
+CHOSUNG_SET = frozenset(CHOSUNG)
+
+TOKEN_PATTERN = re.compile(r'[0-9a-z]+|[가-힣ㄱ-ㅎ]+')
+
+# 매칭 종류별 가중치
+WEIGHT_WORD = 4
+WEIGHT_CHOSUNG = 2
+WEIGHT_SUFFIX = 1
+EXACT_BONUS = 2
+
+# 접미사를 색인할 최대 토큰 길이 (해시 등 긴 토큰은 부분 문자열 검색으로 처리)
+MAX_SUFFIX_TOKEN_LENGTH = 40
+
+
+def tokenize(text):
+    """문서명을 영문/숫자/한글 토큰으로 분리하는 함수"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def to_chosung(token):
+    """한글 토큰을 초성 문자열로 변환하는 함수 (한글이 아니면 None)"""
+    result = []
+    for char in token:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            result.append(CHOSUNG[code // 588])
+        elif char in CHOSUNG_SET:
+            result.append(char)
+        else:
+            return None
+    return ''.join(result)
+
+
+def _index_terms(name):
+    # (색인어, 가중치) 목록 생성. 복합어(FeedPump, 급수펌프)는 접미사도 색인하여 중간 단어 검색을 지원
+    terms = {}
+
+    def add(term, weight):
+        if terms.get(term, 0) < weight:
+            terms[term] = weight
+
+    for token in tokenize(name):
+        add(token, WEIGHT_WORD)
+        chosung = to_chosung(token)
+        if chosung is not None:
+            add(chosung, WEIGHT_CHOSUNG)
+        if len(token) > MAX_SUFFIX_TOKEN_LENGTH:
+            continue
+        for i in range(1, len(token)):
+            add(token[i:], WEIGHT_SUFFIX)
+            if chosung is not None:
+                add(chosung[i:], WEIGHT_SUFFIX)
+    return terms
+
+
+class DocumentIndex:
+    """문서명을 대상으로 하는 증분 갱신 역색인
+
+    색인어를 정렬된 리스트로 유지하여 접두어 검색을 이진 탐색으로 처리합니다.
+    검색어가 한 단어이고 limit이 있으면 점수별로 최신순 정렬해 둔 색인어별 문서 목록을
+    병합하여 limit개를 채우는 즉시 멈춥니다.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._doc_terms = {}
+        self._docs = {}
+        self._terms = []
+        self._ranked = {}
+        self._dirty = False
+        self._source = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _add(self, doc):
+        doc_id = doc['id']
+        terms = _index_terms(doc.get('name', ''))
+        for term, weight in terms.items():
+            self._ranked.pop(term, None)
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._dirty = True
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = terms
+        self._docs[doc_id] = doc
+
+    def _remove(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            self._ranked.pop(term, None)
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._dirty = True
+        self._docs.pop(doc_id, None)
+
+    def add(self, doc):
+        """문서를 색인에 추가하는 함수"""
+        with self._lock:
+            if doc['id'] in self._docs:
+                self._remove(doc['id'])
+            self._add(doc)
+
+    def remove(self, doc_id):
+        """문서를 색인에서 삭제하는 함수"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def sync(self, documents):
+        """문서 리스트와 비교하여 추가/삭제/이름 변경된 문서만 색인에 반영하는 함수"""
+        with self._lock:
+            if documents is self._source:
+                return
+            current = {doc['id']: doc for doc in documents}
+            for doc_id in [doc_id for doc_id in self._docs if doc_id not in current]:
+                self._remove(doc_id)
+            for doc_id, doc in current.items():
+                indexed = self._docs.get(doc_id)
+                if indexed is None:
+                    self._add(doc)
+                elif indexed.get('name') != doc.get('name'):
+                    self._remove(doc_id)
+                    self._add(doc)
+                else:
+                    # 상태 등 이름 외 정보는 최신 객체로 교체
+                    self._docs[doc_id] = doc
+            self._source = documents
+
+    def build(self, documents):
+        """문서 리스트로 색인을 동기화하고 검색에 쓰는 정렬 목록까지 미리 만드는 함수 (문서 조회 시 호출)"""
+        self.sync(documents)
+        with self._lock:
+            if self._dirty:
+                self._terms = sorted(self._postings)
+                self._dirty = False
+            for term in self._postings:
+                if term not in self._ranked:
+                    self._ranked_postings(term)
+
+    def _prefix_matches(self, prefix):
+        start = bisect_left(self._terms, prefix)
+        end = bisect_left(self._terms, prefix + '\uffff', start)
+        return self._terms[start:end]
+
+    def _ranked_postings(self, term):
+        # 색인어의 문서를 가중치별로 나누어 최신순으로 정렬한 목록 (색인어가 바뀌면 다시 만듦)
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = {}
+            for doc_id, weight in self._postings[term].items():
+                ranked.setdefault(weight, []).append(doc_id)
+            docs = self._docs
+            for doc_ids in ranked.values():
+                doc_ids.sort(key=lambda doc_id: -docs[doc_id].get('created_at', 0))
+            self._ranked[term] = ranked
+        return ranked
+
+    def _search_top(self, token, limit):
+        # 점수가 높은 단계부터 최신순으로 병합하여 limit개까지만 반환 (전체 일치 문서의 점수는 계산하지 않음)
+        levels = {}
+        for term in self._prefix_matches(token):
+            bonus = EXACT_BONUS if term == token else 0
+            for weight, doc_ids in self._ranked_postings(term).items():
+                levels.setdefault(weight + bonus, []).append(doc_ids)
+
+        docs = self._docs
+        results = []
+        seen = set()
+        for score in sorted(levels, reverse=True):
+            for doc_id in heapq.merge(*levels[score], key=lambda doc_id: -docs[doc_id].get('created_at', 0)):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                results.append(docs[doc_id])
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def search(self, query, limit=None):
+        """검색어의 모든 토큰이 접두어로 일치하는 문서를 점수순으로 반환하는 함수"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            if self._dirty:
+                self._terms = sorted(self._postings)
+                self._dirty = False
+
+            if len(query_tokens) == 1 and limit is not None:
+                return self._search_top(query_tokens[0], limit)
+
+            scores = None
+            for token in query_tokens:
+                token_scores = {}
+                for term in self._prefix_matches(token):
+                    bonus = EXACT_BONUS if term == token else 0
+                    for doc_id, weight in self._postings[term].items():
+                        score = weight + bonus
+                        if token_scores.get(doc_id, 0) < score:
+                            token_scores[doc_id] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {doc_id: score + token_scores[doc_id]
+                              for doc_id, score in scores.items() if doc_id in token_scores}
+                if not scores:
+                    return []
+
+            docs = self._docs
+            rank_key = lambda doc_id: (-scores[doc_id], -docs[doc_id].get('created_at', 0))
+            if limit is not None:
+                ranked = heapq.nsmallest(limit, scores, key=rank_key)
+            else:
+                ranked = sorted(scores, key=rank_key)
+            return [docs[doc_id] for doc_id in ranked]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(dataset_id):
+    """dataset_id별로 프로세스 전체에서 공유하는 색인을 반환하는 함수"""
+    with _indexes_lock:
+        index = _indexes.get(dataset_id)
+        if index is None:
+            index = _indexes[dataset_id] = DocumentIndex()
+        return index
+
+
+def substring_search(documents, query, limit=None):
+    """문서명에 검색어가 그대로 포함된 문서를 원래 순서대로 반환하는 함수"""
+    needle = query.lower()
+    matches = [doc for doc in documents if needle in doc.get('name', '').lower()]
+    return matches if limit is None else matches[:limit]
+
+
+def search_documents(dataset_id, documents, query, limit=None):
+    """문서 리스트로 색인을 동기화한 뒤 검색 결과를 반환하는 함수
+
+    색인으로 찾지 못하면(기호만 입력했거나 긴 토큰의 중간 부분 등) 문서명 부분 문자열 검색으로 대신합니다.
+    """
+    index = get_index(dataset_id)
+    index.sync(documents)
+    results = index.search(query, limit=limit)
+    if not results:
+        results = substring_search(documents, query, limit=limit)
+    return results
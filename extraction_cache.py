@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# 캐시 디렉터리와 최대 용량 (환경 변수로 변경 가능)
+CACHE_DIR = os.environ.get('EXTRACTION_CACHE_DIR', os.path.join('.cache', 'extraction'))
+MAX_BYTES = int(os.environ.get('EXTRACTION_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+_lock = threading.Lock()
+_total_bytes = None
+
+
+def file_digest(fileobj):
+    """파일 내용의 SHA-256 해시를 반환하는 함수 (UploadedFile 버퍼를 복사하지 않음)"""
+    if hasattr(fileobj, 'getbuffer'):
+        with fileobj.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _path(kind, version, digest, suffix):
+    return os.path.join(CACHE_DIR, f'{kind}-v{version}-{digest}{suffix}')
+
+
+def _scan_total():
+    global _total_bytes
+    if _total_bytes is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _total_bytes = sum(entry.stat().st_size for entry in os.scandir(CACHE_DIR) if entry.is_file())
+    return _total_bytes
+
+
+def _evict():
+    # 가장 오래 사용되지 않은 항목(mtime 기준)부터 삭제
+    global _total_bytes
+    entries = sorted(
+        (entry for entry in os.scandir(CACHE_DIR) if entry.is_file()),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in entries:
+        if _total_bytes <= MAX_BYTES:
+            break
+        try:
+            size = entry.stat().st_size
+            os.unlink(entry.path)
+            _total_bytes -= size
+        except FileNotFoundError:
+            pass
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # 조회 시각을 갱신하여 LRU 순서 유지
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return data
+
+
+def _write(path, data):
+    global _total_bytes
+    with _lock:
+        _scan_total()
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        _total_bytes += os.path.getsize(path) - previous
+        if _total_bytes > MAX_BYTES:
+            _evict()
+
+
+def get_text(digest, version):
+    """캐시된 추출 텍스트를 반환하는 함수 (없으면 None)"""
+    return _read(_path('text', version, digest, '.txt'))
+
+
+def put_text(digest, version, text):
+    """추출 텍스트를 캐시에 저장하는 함수"""
+    _write(_path('text', version, digest, '.txt'), text)
+
+
+def get_result(kind, digest, version):
+    """캐시된 JSON 결과(워크플로우 응답 등)를 반환하는 함수 (없으면 None)"""
+    data = _read(_path(kind, version, digest, '.json'))
+    return json.loads(data) if data is not None else None
+
+
+def put_result(kind, digest, version, result):
+    """JSON 결과를 캐시에 저장하는 함수"""
+    _write(_path(kind, version, digest, '.json'), json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,191 @@
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+import table_extraction
+from text_chunker import PAGE_BREAK
+
+# 추출 로직이 바뀌면 올려서 기존 추출 캐시를 무효화
+EXTRACTOR_VERSION = 3
+
+
+class ExtractionError(Exception):
+    """파일에서 텍스트를 추출할 수 없을 때 발생하는 예외"""
+
+
+class Extractor:
+    __slots__ = ('extension', 'backend', 'func')
+
+    def __init__(self, extension, backend, func):
+        self.extension = extension
+        self.backend = backend
+        self.func = func
+
+
+class _Backend:
+    __slots__ = ('module', 'seconds', 'error')
+
+    def __init__(self):
+        self.module = None
+        self.seconds = None
+        self.error = None
+
+
+# 확장자별 추출기 (등록 순서가 업로드 허용 형식 순서)
+_registry = {}
+# 백엔드 모듈 이름별 로딩 상태
+_backends = {}
+_backend_lock = threading.Lock()
+
+
+def register(*extensions, backend=None):
+    """확장자별 추출 함수를 등록하는 데코레이터
+
+    추출 함수는 func(module, uploaded_file, progress_callback)로 호출되며,
+    module은 backend 모듈을 처음 사용할 때 import한 결과입니다.
+    """
+    def decorator(func):
+        for extension in extensions:
+            _registry[extension] = Extractor(extension, backend, func)
+        if backend is not None:
+            _backends.setdefault(backend, _Backend())
+        return func
+    return decorator
+
+
+def load_backend(name):
+    """백엔드 모듈을 처음 사용할 때 import하고 소요 시간을 기록하는 함수"""
+    with _backend_lock:
+        state = _backends.setdefault(name, _Backend())
+        if state.module is None:
+            started = time.perf_counter()
+            try:
+                state.module = importlib.import_module(name)
+                state.error = None
+            except ImportError as e:
+                state.error = str(e)
+                raise ExtractionError(f"{name} 라이브러리를 불러올 수 없습니다: {e}")
+            finally:
+                state.seconds = time.perf_counter() - started
+        return state.module
+
+
+def supported_types():
+    """업로드 가능한 파일 확장자 목록을 반환하는 함수"""
+    return list(_registry)
+
+
+def open_buffer(uploaded_file):
+    # UploadedFile은 BytesIO이므로 getvalue() 복사 없이 처음 위치로 되돌려 그대로 사용
+    uploaded_file.seek(0)
+    return uploaded_file
+
+
+def extract(uploaded_file, progress_callback=None):
+    """확장자에 맞는 추출기로 텍스트를 추출하는 함수 (실패 시 ExtractionError 발생)"""
+    file_extension = uploaded_file.name.lower().split('.')[-1]
+    extractor = _registry.get(file_extension)
+    if extractor is None:
+        raise ExtractionError(f"지원하지 않는 파일 형식입니다: {file_extension}")
+    module = load_backend(extractor.backend) if extractor.backend else None
+    return extractor.func(module, uploaded_file, progress_callback)
+
+
+def import_report():
+    """백엔드별 로딩 상태와 import 소요 시간을 반환하는 함수"""
+    rows = []
+    for name, state in _backends.items():
+        extensions = [ext for ext, extractor in _registry.items() if extractor.backend == name]
+        if state.error:
+            status = "실패"
+        elif state.module is not None:
+            status = "로드됨"
+        else:
+            status = "미사용"
+        rows.append({
+            '백엔드': name,
+            '형식': ', '.join(extensions),
+            '상태': status,
+            'import 시간(ms)': round(state.seconds * 1000, 1) if state.seconds is not None else None,
+        })
+    return rows
+
+
+def measure_cold_imports():
+    """각 백엔드를 새 프로세스에서 import했을 때의 소요 시간(초)을 반환하는 함수"""
+    code = (
+        "import importlib, sys, time\n"
+        "started = time.perf_counter()\n"
+        "importlib.import_module(sys.argv[1])\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    results = {}
+    for name in _backends:
+        completed = subprocess.run(
+            [sys.executable, '-c', code, name],
+            capture_output=True,
+            text=True
+        )
+        results[name] = float(completed.stdout) if completed.returncode == 0 else None
+    return results
+
+
+@register('pdf', backend='pdf_extraction')
+def _extract_pdf(pdf_extraction, uploaded_file, progress_callback):
+    # 큰 PDF는 프로세스 풀에서 페이지 범위별로 병렬 추출한 뒤 한 번에 결합
+    # 페이지 경계는 청크 분할에 쓰이도록 PAGE_BREAK로 표시
+    pages = pdf_extraction.extract_pdf_pages(open_buffer(uploaded_file), uploaded_file.size, progress_callback)
+    return ("\n" + PAGE_BREAK).join(pages)
+
+
+@register('doc', 'docx', backend='docx2txt')
+def _extract_docx(docx2txt, uploaded_file, progress_callback):
+    return docx2txt.process(open_buffer(uploaded_file))
+
+
+@register('txt', 'md')
+def _extract_plain_text(module, uploaded_file, progress_callback):
+    return uploaded_file.getvalue().decode('utf-8')
+
+
+@register('ppt', 'pptx', backend='pptx')
+def _extract_pptx(pptx, uploaded_file, progress_callback):
+    return "\n".join(iter_pptx_texts(pptx, open_buffer(uploaded_file)))
+
+
+def iter_pptx_texts(pptx, fileobj):
+    """PPTX 슬라이드의 도형 텍스트를 순서대로 반환하는 제너레이터"""
+    prs = pptx.Presentation(fileobj)
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text"):
+                yield shape.text
+
+
+@register('hwp')
+def _extract_hwp(module, uploaded_file, progress_callback):
+    raise ExtractionError("HWP 파일 형식은 현재 지원되지 않습니다. PDF로 변환 후 시도해주세요.")
+
+
+@register('xls', backend='pandas')
+def _extract_xls(pd, uploaded_file, progress_callback):
+    return table_extraction.xls_to_text(pd, open_buffer(uploaded_file))
+
+
+@register('xlsx', backend='openpyxl')
+def _extract_xlsx(openpyxl, uploaded_file, progress_callback):
+    return table_extraction.xlsx_to_text(openpyxl, open_buffer(uploaded_file))
+
+
+@register('csv')
+def _extract_csv(module, uploaded_file, progress_callback):
+    return table_extraction.csv_to_text(open_buffer(uploaded_file))
+
+
+if __name__ == '__main__':
+    # 백엔드별 콜드 스타트 import 비용 보고: python extractors.py
+    for name, seconds in measure_cold_imports().items():
+        cost = f"{seconds * 1000:8.1f} ms" if seconds is not None else "   import 실패"
+        print(f"{name:<16}{cost}")
@@ -0,0 +1,160 @@
+import threading
+import time
+
+# 상태 확인 간격 (초): 변화가 없으면 두 배씩 늘리고 변화가 생기면 처음으로 되돌림
+MIN_INTERVAL = 2.0
+MAX_INTERVAL = 30.0
+
+# 한 번에 조회할 수 있는 최대 문서 수와, 캐시 이후 새로 추가된 문서를 고려한 여유분
+MAX_LIMIT = 100
+LIMIT_SLACK = 10
+
+# 이 시간(초)이 지나도 끝나지 않은 문서는 상태가 바뀔 때까지 추적을 중단 (문서 리스트 TTL 갱신에 맡김)
+MAX_TRACK_SECONDS = 30 * 60
+
+# 색인이 끝난 상태
+DONE_STATUSES = frozenset(['completed', 'error', 'paused'])
+
+
+def is_pending(doc):
+    """문서가 아직 색인 중인지 확인하는 함수"""
+    return doc.get('indexing_status') not in DONE_STATUSES
+
+
+class _Dataset:
+    __slots__ = ('pending', 'limit', 'interval', 'next_poll')
+
+    def __init__(self, now, min_interval):
+        self.pending = {}
+        self.limit = MAX_LIMIT
+        self.interval = min_interval
+        self.next_poll = now + min_interval
+
+
+class IndexingTracker:
+    """색인 중인 문서의 상태만 백그라운드에서 확인해 문서 캐시에 반영하는 추적기
+
+    데이터셋마다 한 번의 요청으로 최신 문서 페이지(색인 중인 문서가 모두 들어가는
+    크기)를 조회하고, 상태가 바뀐 문서만 캐시에서 교체합니다.
+    """
+
+    def __init__(self, cache, fetch_recent, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self._cache = cache
+        self._fetch_recent = fetch_recent
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._datasets = {}
+        # dataset_id -> {doc_id: 추적을 포기할 때의 상태}
+        self._given_up = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.polls = 0
+
+    def track(self, dataset_id, documents):
+        """created_at 역순 문서 리스트에서 색인 중인 문서를 추적 대상으로 등록하는 함수"""
+        pending = {}
+        positions = {}
+        for position, doc in enumerate(documents):
+            if is_pending(doc):
+                pending[doc['id']] = doc.get('indexing_status')
+                positions[doc['id']] = position
+
+        with self._lock:
+            # 추적을 포기한 문서는 상태가 바뀌기 전까지 다시 등록하지 않음
+            given_up = {doc_id: status for doc_id, status in self._given_up.get(dataset_id, {}).items()
+                        if pending.get(doc_id) == status}
+            if given_up:
+                self._given_up[dataset_id] = given_up
+                for doc_id in given_up:
+                    del pending[doc_id]
+            else:
+                self._given_up.pop(dataset_id, None)
+            oldest_position = max((positions[doc_id] for doc_id in pending), default=0)
+
+            state = self._datasets.get(dataset_id)
+            if not pending:
+                self._datasets.pop(dataset_id, None)
+                return
+            now = time.monotonic()
+            if state is None:
+                state = self._datasets[dataset_id] = _Dataset(now, self._min_interval)
+                self._wakeup.set()
+            elif pending.keys() - state.pending.keys():
+                # 새로 올라온 문서가 있으면 빠른 확인 간격으로 되돌림
+                state.interval = self._min_interval
+                state.next_poll = min(state.next_poll, now + self._min_interval)
+                self._wakeup.set()
+            state.pending = {
+                doc_id: (status, state.pending[doc_id][1] if doc_id in state.pending else now)
+                for doc_id, status in pending.items()
+            }
+            state.limit = min(MAX_LIMIT, oldest_position + 1 + LIMIT_SLACK)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='indexing-tracker', daemon=True)
+                self._thread.start()
+
+    def pending_count(self, dataset_id):
+        """추적 중인 색인 대기 문서 수를 반환하는 함수"""
+        with self._lock:
+            state = self._datasets.get(dataset_id)
+            return len(state.pending) if state else 0
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if not self._datasets:
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                due = [(dataset_id, state.limit) for dataset_id, state in self._datasets.items()
+                       if state.next_poll <= now]
+                wait = min(state.next_poll for state in self._datasets.values()) - now
+                self._wakeup.clear()
+
+            for dataset_id, limit in due:
+                self._poll(dataset_id, limit)
+            if not due:
+                self._wakeup.wait(timeout=max(wait, 0.0))
+
+    def _poll(self, dataset_id, limit):
+        try:
+            documents = self._fetch_recent(dataset_id, limit)
+        except Exception:
+            documents = None
+
+        updates = {}
+        completed = False
+        with self._lock:
+            self.polls += 1
+            state = self._datasets.get(dataset_id)
+            if state is None:
+                return
+            now = time.monotonic()
+            for doc in documents or []:
+                tracked = state.pending.get(doc['id'])
+                if tracked is None:
+                    continue
+                if doc.get('indexing_status') != tracked[0]:
+                    updates[doc['id']] = doc
+                    state.pending[doc['id']] = (doc.get('indexing_status'), tracked[1])
+                if not is_pending(doc):
+                    del state.pending[doc['id']]
+                    completed = completed or doc.get('indexing_status') == 'completed'
+            for doc_id in [doc_id for doc_id, (_, since) in state.pending.items()
+                           if now - since > MAX_TRACK_SECONDS]:
+                status, _ = state.pending.pop(doc_id)
+                self._given_up.setdefault(dataset_id, {})[doc_id] = status
+
+            # 상태가 바뀌면 빠르게, 변화가 없거나 조회에 실패하면 점점 느리게 확인
+            if updates:
+                state.interval = self._min_interval
+            else:
+                state.interval = min(state.interval * 2, self._max_interval)
+            state.next_poll = now + state.interval
+            if not state.pending:
+                del self._datasets[dataset_id]
+
+        if updates:
+            # 색인이 끝난 문서가 생기면 이전 답변이 달라질 수 있으므로 버전을 올림
+            self._cache.patch(dataset_id, updates, bump_version=completed)
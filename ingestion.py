@@ -0,0 +1,197 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+
+import extraction_cache
+import workflow_jobs
+from api_client import ApiError
+from file_preprocessing import (
+    MAX_PREPROCESS_SIZE,
+    ExtractionError,
+    create_document_by_file,
+    extract_text,
+)
+
+# 단계별 동시 실행 제한 (추출은 CPU, 업로드는 API 호출)
+# 전처리 워크플로우와 그 결과 업로드는 workflow_jobs의 백그라운드 작업에서 실행
+STAGE_LIMITS = {
+    'extract': 2,
+    'upload': 4,
+}
+
+STAGE_LABELS = {
+    'queued': '대기 중',
+    'extract': '텍스트 추출',
+    'upload': '업로드',
+    'submitted': '전처리 작업 등록',
+    'done': '완료',
+    'failed': '실패',
+}
+
+# 진행 상황 화면 갱신 주기 (초)
+REFRESH_INTERVAL = 0.3
+
+
+class FileJob:
+    """파일 하나의 수집 진행 상태"""
+
+    def __init__(self, file):
+        self.file = file
+        self.name = file.name
+        self.size = file.size
+        self.stage = 'queued'
+        self.waiting = False
+        self.detail = ''
+        self.error = None
+        self.job_id = None
+        self.result = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class IngestionPipeline:
+    """추출 → 워크플로우 → 데이터셋 업로드 단계를 파일별로 동시에 처리하는 파이프라인
+
+    단계마다 세마포어로 동시 실행 수를 제한하므로, 한 파일이 업로드되는 동안
+    다른 파일의 추출이 함께 진행됩니다. 전처리 모드에서는 추출이 끝난 파일을
+    워크플로우 작업으로 등록하고 바로 다음 파일로 넘어갑니다.
+    """
+
+    def __init__(self, files, dataset_id, preprocess, user, stage_limits=None):
+        self.dataset_id = dataset_id
+        self.user = user
+        self.preprocess = preprocess
+        self.jobs = [FileJob(file) for file in files]
+        limits = dict(STAGE_LIMITS, **(stage_limits or {}))
+        self._semaphores = {stage: threading.BoundedSemaphore(limit) for stage, limit in limits.items()}
+        self._max_workers = max(1, min(len(self.jobs), sum(limits.values())))
+        self._futures = []
+
+    def start(self):
+        executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='ingestion')
+        self._futures = [executor.submit(self._run, job) for job in self.jobs]
+        executor.shutdown(wait=False)
+        return self
+
+    def done(self):
+        return all(future.done() for future in self._futures)
+
+    def _enter(self, job, stage):
+        job.stage = stage
+        job.waiting = True
+        job.detail = ''
+        semaphore = self._semaphores[stage]
+        semaphore.acquire()
+        job.waiting = False
+        return semaphore
+
+    def _run(self, job):
+        job.started_at = time.monotonic()
+        try:
+            if self.preprocess:
+                self._run_preprocess(job)
+                job.stage = 'submitted'
+            else:
+                def report_upload(sent, total):
+                    job.detail = f"{sent / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f}MB"
+
+                def report_queue(position):
+                    job.detail = f"요청 대기열 {position}번째" if position else ''
+
+                semaphore = self._enter(job, 'upload')
+                try:
+                    job.result = create_document_by_file(self.dataset_id, job.file, report_upload, report_queue)
+                finally:
+                    semaphore.release()
+                job.stage = 'done'
+        except ApiError as e:
+            job.error = f"API 요청 실패 (상태 코드: {e.status_code}) {e.text}"
+            job.stage = 'failed'
+        except requests.exceptions.Timeout:
+            job.error = "처리 시간이 초과되었습니다."
+            job.stage = 'failed'
+        except Exception as e:
+            job.error = str(e)
+            job.stage = 'failed'
+        finally:
+            job.finished_at = time.monotonic()
+
+    def _run_preprocess(self, job):
+        if job.size > MAX_PREPROCESS_SIZE:
+            raise ExtractionError("파일 크기가 200MB를 초과합니다.")
+
+        def report_progress(done, total):
+            job.detail = f"{done}/{total} 페이지"
+
+        semaphore = self._enter(job, 'extract')
+        try:
+            digest = extraction_cache.file_digest(job.file)
+            text = extract_text(job.file, digest, report_progress)
+        finally:
+            semaphore.release()
+        if not text:
+            raise ExtractionError("추출된 텍스트가 없습니다.")
+
+        job.job_id = workflow_jobs.submit_job(self.user, self.dataset_id, job.name, digest, text)
+
+    def summary_rows(self):
+        """결과 요약 표에 들어갈 행 목록을 반환하는 함수"""
+        return [
+            {
+                '파일': job.name,
+                '크기(MB)': round(job.size / (1024 * 1024), 1),
+                '결과': STAGE_LABELS[job.stage],
+                '소요 시간(초)': round(job.elapsed, 1),
+                '오류': job.error or '',
+            }
+            for job in self.jobs
+        ]
+
+
+def _progress_line(job):
+    if job.stage in ('done', 'submitted', 'failed'):
+        icon = '❌' if job.stage == 'failed' else '✅'
+        return f"{icon} {job.name} — {STAGE_LABELS[job.stage]} ({job.elapsed:.1f}초)"
+    label = STAGE_LABELS[job.stage] + (' 대기' if job.waiting and job.stage != 'queued' else '')
+    detail = f" · {job.detail}" if job.detail else ''
+    return f"⏳ {job.name} — {label}{detail}"
+
+
+def run_ingestion(files, dataset_id, preprocess, user):
+    """파일들을 동시에 수집하면서 파일별 진행 상황과 결과 요약을 표시하는 함수"""
+    pipeline = IngestionPipeline(files, dataset_id, preprocess, user).start()
+
+    overall = st.progress(0.0)
+    placeholders = [st.empty() for _ in pipeline.jobs]
+    while True:
+        finished = pipeline.done()
+        completed = sum(job.stage in ('done', 'submitted', 'failed') for job in pipeline.jobs)
+        overall.progress(completed / len(pipeline.jobs), text=f"파일 처리 중... ({completed}/{len(pipeline.jobs)})")
+        for placeholder, job in zip(placeholders, pipeline.jobs):
+            placeholder.text(_progress_line(job))
+        if finished:
+            break
+        time.sleep(REFRESH_INTERVAL)
+
+    overall.empty()
+    for placeholder in placeholders:
+        placeholder.empty()
+
+    succeeded = sum(job.stage in ('done', 'submitted') for job in pipeline.jobs)
+    if succeeded == len(pipeline.jobs):
+        st.success(f"{succeeded}개 파일 처리 완료!")
+    else:
+        st.warning(f"{len(pipeline.jobs)}개 중 {succeeded}개 파일 처리 완료")
+    st.dataframe(pipeline.summary_rows(), use_container_width=True, hide_index=True)
+    if preprocess and succeeded:
+        st.info("전처리는 백그라운드에서 진행됩니다. 다른 화면으로 이동해도 '⚙️ 전처리 작업'에서 결과를 확인할 수 있습니다.")
+    return pipeline
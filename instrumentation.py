@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 계측 설정 (환경 변수로 켜며, 꺼져 있으면 span()은 아무 일도 하지 않음)
+JSONL_PATH = os.environ.get('METRICS_JSONL_PATH')
+PORT = int(os.environ.get('METRICS_PORT', 0))
+ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes') or bool(JSONL_PATH or PORT)
+
+# 히스토그램 구간 경계 (초)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_NAME = 'genai_span_seconds'
+
+_lock = threading.Lock()
+# (이름, 라벨 튜플) -> [횟수, 합계, 최대, 구간별 횟수]
+_stats = {}
+_local = threading.local()
+_jsonl_file = None
+_server = None
+
+
+class _NoopSpan:
+    """계측이 꺼져 있을 때 반환하는 빈 컨텍스트 매니저"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        labels = self.labels
+        if exc_type is not None:
+            labels = dict(labels, error=exc_type.__name__)
+        observe(self.name, time.perf_counter() - self.started, **labels)
+        return False
+
+
+def span(name, **labels):
+    """with 블록의 실행 시간을 name으로 기록하는 컨텍스트 매니저를 반환하는 함수"""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, labels)
+
+
+def observe(name, seconds, **labels):
+    """따로 측정한 시간(초)을 name으로 기록하는 함수"""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    record = {'ts': round(time.time(), 3), 'span': name, 'seconds': round(seconds, 6), 'labels': dict(key[1])}
+    with _lock:
+        stat = _stats.get(key)
+        if stat is None:
+            stat = _stats[key] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stat[3][index] += 1
+        if _jsonl_file is not None:
+            _jsonl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    # 스크립트 실행 중이면 이번 실행의 기록에도 추가
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun.append(record)
+
+
+def begin_rerun():
+    """현재 스레드에서 새 스크립트 실행의 계측을 시작하는 함수"""
+    if ENABLED:
+        _local.rerun = []
+        _local.rerun_started = time.perf_counter()
+
+
+def finish_rerun(**labels):
+    """스크립트 실행 전체 시간을 기록하고 이번 실행의 계측 기록을 반환하는 함수"""
+    records = getattr(_local, 'rerun', None)
+    if not ENABLED or records is None:
+        return []
+    _local.rerun = None
+    observe('rerun', time.perf_counter() - _local.rerun_started, **labels)
+    return records
+
+
+def snapshot():
+    """span별 누적 통계를 반환하는 함수"""
+    with _lock:
+        items = [(key, stat[0], stat[1], stat[2]) for key, stat in _stats.items()]
+    return [
+        {
+            'span': name,
+            'labels': ', '.join(f'{k}={v}' for k, v in labels),
+            'count': count,
+            'avg_ms': round(total / count * 1000, 1),
+            'max_ms': round(maximum * 1000, 1),
+        }
+        for (name, labels), count, total, maximum in sorted(items)
+    ]
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def prometheus_text():
+    """누적 통계를 Prometheus 텍스트 형식의 히스토그램으로 반환하는 함수"""
+    with _lock:
+        items = sorted((key, stat[0], stat[1], list(stat[3])) for key, stat in _stats.items())
+    lines = [
+        f'# HELP {METRIC_NAME} Time spent in instrumented hot paths.',
+        f'# TYPE {METRIC_NAME} histogram',
+    ]
+    for (name, labels), count, total, buckets in items:
+        pairs = (('span', name),) + labels
+        for bound, bucket_count in zip(BUCKETS, buckets):
+            lines.append(f'{METRIC_NAME}_bucket{_format_labels(pairs + (("le", str(bound)),))} {bucket_count}')
+        lines.append(f'{METRIC_NAME}_bucket{_format_labels(pairs + (("le", "+Inf"),))} {count}')
+        lines.append(f'{METRIC_NAME}_sum{_format_labels(pairs)} {total}')
+        lines.append(f'{METRIC_NAME}_count{_format_labels(pairs)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """/metrics로 Prometheus 텍스트를 제공하는 서버를 백그라운드에서 시작하는 함수 (프로세스당 한 번)"""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+    return _server
+
+
+if ENABLED and JSONL_PATH:
+    os.makedirs(os.path.dirname(os.path.abspath(JSONL_PATH)), exist_ok=True)
+    # 한 줄씩 바로 기록되도록 줄 단위 버퍼 사용
+    _jsonl_file = open(JSONL_PATH, 'a', encoding='utf-8', buffering=1)
+
+if ENABLED and PORT:
+    start_metrics_server(PORT)
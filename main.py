@@ -1,21 +1,40 @@
 import streamlit as st
-import requests
-import json
 from datetime import datetime
+from ingestion import run_ingestion
+from workflow_jobs import show_workflow_jobs
+import hmac
+import time
 import uuid
-from file_preprocessing import preprocess_files, upload_to_knowledge_directly  # Ensure this module is correctly implemented
-import traceback
-import html  # HTML 이스케이프를 위해 추가
+import api_client
+import chat_engine
+from answer_cache import answer_cache
+from document_list import document_cache, get_cached_documents, indexing_tracker
+from document_search import search_documents
+from chat_render import StreamRenderer, history_html, message_html
+import conversation_store
+import instrumentation
+from extractors import supported_types, import_report
 
-# 필요한 라이브러리 추가
-import PyPDF2
-import docx2txt
-import pandas as pd
-import pptx
-# HWP 파일 처리를 위한 라이브러리가 필요합니다.
+# 답변 버퍼 확인 주기 (초)
+CHAT_POLL_INTERVAL = 0.03
 
-# API URL 정의
-API_URL = 'https://mir-api.52g.ai/v1'
+# 새 질문으로 이전 답변을 중지할 때 답변 저장을 기다리는 최대 시간 (초)
+CHAT_CANCEL_TIMEOUT = 5
+
+# 사이드바에 표시할 최대 문서 카드 수 (나머지는 검색으로 찾음)
+MAX_DOC_CARDS = 50
+
+# 한 번에 불러오는 대화 메시지 수
+HISTORY_PAGE_SIZE = 20
+
+# API 대화 없이 시작된 대화(캐시 답변)의 다음 질문에 맥락으로 붙일 최대 이전 메시지 수
+CONTEXT_MAX_MESSAGES = 6
+
+# 브라우저 세션 식별자를 URL에 유지하는 쿼리 파라미터 이름
+USER_ID_PARAM = 'uid'
+
+# 이번 실행의 구간별 시간 계측 시작 (METRICS_* 환경 변수로 켠 경우에만 기록)
+instrumentation.begin_rerun()
 
 # 페이지 설정
 st.set_page_config(
@@ -27,28 +46,169 @@ st.set_page_config(
 
 # 사용자와 에이전트 메시지 표시 함수 정의
 def display_user_message(message, timestamp):
-    escaped_message = html.escape(message)
-    st.markdown(f"""
-    <div class="message user-message">
-        <div class="message-content">
-            <div class="avatar">🧑</div>
-            <div class="text">{escaped_message}</div>
-        </div>
-        <div class="message-timestamp">{timestamp}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(message_html('user', message, timestamp), unsafe_allow_html=True)
 
 def display_agent_message(message, timestamp):
-    escaped_message = html.escape(message)
-    st.markdown(f"""
-    <div class="message agent-message">
-        <div class="message-content">
-            <div class="avatar">🤖</div>
-            <div class="text">{escaped_message}</div>
-        </div>
-        <div class="message-timestamp">{timestamp}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(message_html('assistant', message, timestamp), unsafe_allow_html=True)
+
+def load_history(conversation_id):
+    """대화의 최근 메시지만 불러와 세션에 보관하는 함수"""
+    messages = conversation_store.load_messages(conversation_id, HISTORY_PAGE_SIZE + 1)
+    st.session_state.history = {
+        'conversation_id': conversation_id,
+        'messages': messages[-HISTORY_PAGE_SIZE:],
+        'has_more': len(messages) > HISTORY_PAGE_SIZE,
+        'window': HISTORY_PAGE_SIZE
+    }
+    return st.session_state.history
+
+def get_history(conversation_id):
+    """세션에 불러온 대화 메시지를 반환하는 함수 (다른 대화면 새로 불러옴)"""
+    history = st.session_state.get('history')
+    if not history or history['conversation_id'] != conversation_id:
+        history = load_history(conversation_id)
+    return history
+
+def load_earlier_history(history):
+    """표시 범위를 한 페이지 넓히고, 불러온 메시지가 부족하면 이전 메시지를 더 불러오는 함수"""
+    history['window'] += HISTORY_PAGE_SIZE
+    if len(history['messages']) < history['window'] and history['has_more']:
+        before_id = history['messages'][0]['id'] if history['messages'] else None
+        earlier = conversation_store.load_messages(history['conversation_id'], HISTORY_PAGE_SIZE + 1, before_id)
+        history['messages'] = earlier[-HISTORY_PAGE_SIZE:] + history['messages']
+        history['has_more'] = len(earlier) > HISTORY_PAGE_SIZE
+
+def append_message(conversation_id, role, message, timestamp):
+    """메시지를 대화 저장소에 추가하고, 화면에 불러온 대화면 세션에도 반영하는 함수"""
+    saved = conversation_store.append_message(conversation_id, role, message, timestamp)
+    add_to_history(conversation_id, saved)
+
+def add_to_history(conversation_id, saved):
+    """저장된 메시지를 화면에 불러온 대화의 세션 기록에 반영하는 함수"""
+    history = st.session_state.get('history')
+    if history and history['conversation_id'] == conversation_id:
+        history['messages'].append(saved)
+        # 긴 대화에서도 세션에는 표시 범위만큼만 보관
+        if len(history['messages']) > history['window']:
+            del history['messages'][:-history['window']]
+            history['has_more'] = True
+
+def get_session_user_id():
+    """브라우저 세션마다 고유한 사용자 식별자를 반환하는 함수
+
+    처음 접속하면 UUID를 만들고 URL의 uid 파라미터에 기록하므로, 새로고침해도
+    같은 대화 목록과 전처리 작업을 볼 수 있습니다.
+    """
+    if 'user_id' not in st.session_state:
+        user_id = st.query_params.get(USER_ID_PARAM, '')
+        try:
+            user_id = uuid.UUID(user_id).hex
+        except ValueError:
+            user_id = uuid.uuid4().hex
+        st.session_state.user_id = user_id
+    if st.query_params.get(USER_ID_PARAM) != st.session_state.user_id:
+        st.query_params[USER_ID_PARAM] = st.session_state.user_id
+    return st.session_state.user_id
+
+def is_metrics_admin():
+    """URL의 admin 파라미터가 secrets의 METRICS_ADMIN_TOKEN과 일치하는지 확인하는 함수 (미설정 시 항상 False)"""
+    admin_token = st.secrets.get("METRICS_ADMIN_TOKEN", "")
+    given_token = st.query_params.get('admin', '')
+    return bool(admin_token) and hmac.compare_digest(given_token.encode('utf-8'), str(admin_token).encode('utf-8'))
+
+def build_query(conversation_id, prompt, api_conversation_id):
+    """API에 보낼 질문을 만드는 함수
+
+    캐시된 답변으로 시작해 API에 아직 대화가 없으면, 사용자가 본 이전 질문/답변을
+    질문 앞에 붙여 API가 같은 맥락에서 답하도록 합니다.
+    """
+    if api_conversation_id:
+        return prompt
+    # 방금 저장한 현재 질문을 제외한 이전 메시지
+    earlier = conversation_store.load_messages(conversation_id, CONTEXT_MAX_MESSAGES + 1)[:-1]
+    if not earlier:
+        return prompt
+    lines = ["[이전 대화]"]
+    for message in earlier:
+        speaker = "질문" if message['role'] == 'user' else "답변"
+        lines.append(f"{speaker}: {message['message']}")
+    lines.append("")
+    lines.append("[현재 질문]")
+    lines.append(prompt)
+    return '\n'.join(lines)
+
+def save_chat_answer(stream, conversation_id, cache_key):
+    """답변 스레드에서 완료된 답변과 API conversation_id를 저장하는 함수
+
+    세션(브라우저 탭)이 답변 도중 닫히거나 새로고침되어도 답변과 대화 맥락이 남도록
+    화면 재실행과 관계없이 답변 스레드에서 호출됩니다. (st.* 호출 없음)
+    """
+    answer = stream.text
+    if stream.cancelled:
+        answer += "\n\n(답변 생성이 중지되었습니다)"
+    if answer and conversation_store.get_conversation(conversation_id):
+        stream.saved_message = conversation_store.append_message(
+            conversation_id,
+            'assistant',
+            answer,
+            datetime.now().strftime('%Y-%m-%d %H:%M')
+        )
+    # 정상 완료된 첫 질문의 답변은 답변 캐시에 저장
+    if cache_key and stream.end_payload and not stream.error and stream.text:
+        answer_cache.put(cache_key, stream.text)
+    # API에서 conversation_id를 반환하면 해당 대화에 저장
+    if stream.conversation_id:
+        conversation_store.set_api_conversation_id(conversation_id, stream.conversation_id)
+
+def finalize_chat_stream(active_chat):
+    """답변 스레드가 저장한 답변을 화면 기록에 반영하고 진행 중인 스트림 상태를 정리하는 함수"""
+    stream = active_chat['stream']
+    if not stream.finalized:
+        stream.finalized = True
+        if stream.saved_message:
+            add_to_history(active_chat['conversation_id'], stream.saved_message)
+        if stream.error:
+            st.error(f"⚠️ {stream.error}")
+        # 질문부터 첫 토큰까지의 시간과 전체 답변 시간 기록
+        if stream.first_token_at is not None:
+            instrumentation.observe('chat.ttft', stream.first_token_at - stream.started_at, plant=active_chat['plant'])
+            instrumentation.observe('chat.total', time.monotonic() - stream.started_at, plant=active_chat['plant'])
+    st.session_state.chat_stream = None
+
+def show_timing_panel(timings):
+    """이번 실행의 구간별 시간과 누적 통계, 프로세스 운영 지표를 표시하는 관리자용 패널"""
+    with st.expander("⏱️ 실행 시간 계측 (관리자)"):
+        if instrumentation.ENABLED:
+            st.caption("이번 실행")
+            st.dataframe(
+                [{'span': record['span'],
+                  'labels': ', '.join(f'{k}={v}' for k, v in record['labels'].items()),
+                  'ms': round(record['seconds'] * 1000, 1)} for record in timings],
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption("프로세스 누적")
+            st.dataframe(instrumentation.snapshot(), hide_index=True, use_container_width=True)
+        else:
+            st.caption("구간별 시간 계측이 꺼져 있습니다 (METRICS_ENABLED=1로 켤 수 있음).")
+
+        # 답변 캐시 적중 현황
+        cache_stats = answer_cache.stats()
+        st.caption(
+            f"💾 답변 캐시: 적중 {cache_stats['hits']} / 미적중 {cache_stats['misses']} "
+            f"({cache_stats['hit_rate']:.0%}) · {cache_stats['entries']}개 저장"
+        )
+
+        # 동시에 들어온 같은 조회 요청을 합쳐 절약한 업스트림 호출 수
+        flight_stats = api_client.request_flight.stats()
+        st.caption(
+            f"🔗 중복 요청 병합: 실행 {flight_stats['executed']} / 절약 {flight_stats['shared']} "
+            f"({flight_stats['saved_rate']:.0%})"
+        )
+
+        # 파일 형식별 추출 라이브러리 로딩 현황 (처음 사용할 때 import)
+        st.caption("⚙️ 추출 라이브러리 로딩 현황")
+        st.dataframe(import_report(), hide_index=True, use_container_width=True)
 
 # 스타일 시트 정의
 st.markdown("""
@@ -386,26 +546,8 @@ if 'api_key' not in st.session_state:
         st.error('⚠️ API 키가 설정되어 있지 않습니다.')
         st.stop()
 
-if 'conversations' not in st.session_state:
-    st.session_state.conversations = {}
-
-if 'recent_chats' not in st.session_state:
-    st.session_state.recent_chats = []
-
-if 'conversation_id' not in st.session_state:
-    # 기존 대화가 있으면 가장 최근 대화로 설정, 없으면 새로운 대화 생성
-    if st.session_state.recent_chats:
-        st.session_state.conversation_id = st.session_state.recent_chats[0]['id']
-    else:
-        new_chat_id = str(uuid.uuid4())
-        st.session_state.conversation_id = new_chat_id
-        st.session_state.conversations[new_chat_id] = []
-        st.session_state.recent_chats.insert(0, {
-            'id': new_chat_id,
-            'title': "새 대화",
-            'date': datetime.now().strftime('%m-%d'),
-            'messages': []
-        })
+# API 요청과 대화/작업 저장에 사용할 사용자 식별자 (브라우저 세션별)
+api_user = 'user-' + get_session_user_id()
 
 # 사이드바 구성
 with st.sidebar:
@@ -430,17 +572,9 @@ with st.sidebar:
                 key="new_chat", 
                 help="새 대화를 시작합니다.",
                 use_container_width=True):
-        new_chat_id = str(uuid.uuid4())
-        new_chat = {
-            'id': new_chat_id,
-            'title': "새 대화",
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'messages': []
-        }
-        st.session_state.recent_chats.insert(0, new_chat)
-        st.session_state.conversation_id = new_chat_id
-        st.session_state.conversations[new_chat_id] = []
-        st.session_state['api_conversation_id'] = None  # API용 conversation_id 초기화
+        # 대화는 사업장별로 관리되므로 사업장 선택 후에 새 대화를 만듦
+        st.session_state.conversation_id = None
+        st.session_state.start_new_chat = True
         st.rerun()
 
     # 사업장 선택 섹션
@@ -484,12 +618,27 @@ with st.sidebar:
     elif st.session_state.previous_plant != selected_plant:
         st.session_state.previous_plant = selected_plant
 
+    # 현재 대화 확인: 없거나 삭제되었거나 다른 사업장의 대화면 이 사업장의 최근 대화로 전환
+    current_conversation = None
+    if st.session_state.pop('start_new_chat', False):
+        current_conversation = conversation_store.create_conversation(api_user, selected_plant)
+        st.session_state.conversation_id = current_conversation['id']
+    elif st.session_state.get('conversation_id'):
+        current_conversation = conversation_store.get_conversation(st.session_state.conversation_id)
+    if (not current_conversation
+            or current_conversation['user_id'] != api_user
+            or current_conversation['plant'] != selected_plant):
+        latest = conversation_store.list_conversations(api_user, selected_plant, limit=1)
+        current_conversation = latest[0] if latest else conversation_store.create_conversation(api_user, selected_plant)
+        st.session_state.conversation_id = current_conversation['id']
+
     # 최근 대화 섹션
     st.markdown('<div class="section-title">💬 최근 대화</div>', unsafe_allow_html=True)
-    if not st.session_state.recent_chats:
+    recent_chats = conversation_store.list_conversations(api_user, selected_plant, limit=5)
+    if not recent_chats:
         st.write("최근 대화가 없습니다.")
     else:
-        for chat in st.session_state.recent_chats[:5]:
+        for chat in recent_chats:
             chat_id = chat['id']
             chat_date = chat.get('date', '')
             is_selected = st.session_state.conversation_id == chat_id
@@ -497,7 +646,7 @@ with st.sidebar:
             # 선택 버튼과 삭제 버튼을 별도로 생성
             col1, col2 = st.columns([4, 1])
             with col1:
-                if st.button(f"✅ {chat_date} ({len(st.session_state.conversations.get(chat_id, []))} 메시지)", 
+                if st.button(f"✅ {chat_date} ({chat['message_count']} 메시지)", 
                             key=f"select_{chat_id}",
                             use_container_width=True):
                     st.session_state.conversation_id = chat_id
@@ -505,35 +654,22 @@ with st.sidebar:
             
             with col2:
                 if st.button("❌", key=f"delete_{chat_id}"):
-                    st.session_state.recent_chats = [c for c in st.session_state.recent_chats if c['id'] != chat_id]
-                    if chat_id in st.session_state.conversations:
-                        del st.session_state.conversations[chat_id]
+                    conversation_store.delete_conversation(chat_id)
                     if st.session_state.conversation_id == chat_id:
-                        if st.session_state.recent_chats:
-                            st.session_state.conversation_id = st.session_state.recent_chats[0]['id']
-                        else:
-                            new_chat_id = str(uuid.uuid4())
-                            st.session_state.conversation_id = new_chat_id
-                            st.session_state.conversations[new_chat_id] = []
-                            st.session_state.recent_chats.insert(0, {
-                                'id': new_chat_id,
-                                'title': "새 대화",
-                                'date': datetime.now().strftime('%Y-%m-%d'),
-                                'messages': []
-                            })
-                            st.session_state['api_conversation_id'] = None  # API용 conversation_id 초기화
+                        # 다음 실행에서 이 사업장의 최근 대화(없으면 새 대화)로 전환
+                        st.session_state.conversation_id = None
                     st.rerun()
 
     # 파일 업로드 섹션 수정
     st.markdown('<div class="section-title">📁 문서 자동 전처리/업로드</div>', unsafe_allow_html=True)
 
     # 전처리 모드 토글을 div로 감싸서 표시
-    preprocess_mode = st.toggle('🔄 전처리 모드(대용량 파일은 OFF)', value=False, help="전처리 모드를 켜면 문서를 LLM으로 전처리 후 업로드합니다.")
+    preprocess_mode = st.toggle('🔄 전처리 모드', value=False, help="전처리 모드를 켜면 문서를 LLM으로 전처리 후 업로드합니다. 큰 문서는 구간별로 나누어 병렬 처리합니다.")
 
     with st.form(key='file_upload_form'):
         uploaded_files = st.file_uploader(
             "",
-            type=['pdf', 'doc', 'docx', 'txt', 'md', 'ppt', 'pptx', 'hwp', 'xls', 'xlsx', 'csv'],
+            type=supported_types(),
             accept_multiple_files=True,
             label_visibility="collapsed",
             key="file_uploader"
@@ -559,26 +695,17 @@ with st.sidebar:
                 if invalid_files:
                     st.warning(f"⚠️ 다음 파일이 50MB를 초과합니다:\n" + "\n".join(invalid_files))
                 else:
-                    with st.spinner("처리 중..."):
-                        try:
-                            for file in uploaded_files:
-                                if preprocess_mode:
-                                    # 기존 전처리 로직 사용
-                                    result = preprocess_files([file], st.session_state.dataset_id)
-                                    if result:
-                                        st.success(f"'{file.name}' 파일 전처리 완료!")
-                                    else:
-                                        st.error(f"'{file.name}' 파일 전처리 실패")
-                                else:
-                                    # 직접 지식 데이터셋에 업로드
-                                    result = upload_to_knowledge_directly(file, st.session_state.dataset_id)
-                                    if not result:
-                                        st.error(f"'{file.name}' 파일 업로드 실패")
-                        except Exception as e:
-                            st.error(f"❌ 오류 발생: {str(e)}")
+                    try:
+                        # 추출 → 전처리 → 업로드 단계를 파일별로 동시에 처리
+                        run_ingestion(uploaded_files, st.session_state.dataset_id, preprocess_mode, api_user)
+                    except Exception as e:
+                        st.error(f"❌ 오류 발생: {str(e)}")
             else:
                 st.warning("업로드된 파일이 없습니다.")
 
+    # 백그라운드 전처리 작업 상태 (다른 화면에 다녀와도 유지)
+    show_workflow_jobs(api_user)
+
     # 저장 문서 섹션
     st.markdown('<div class="section-title">📚 저장된 문서</div>', unsafe_allow_html=True)
 
@@ -586,26 +713,28 @@ with st.sidebar:
     search_query = st.text_input("", placeholder="문서 검색...", label_visibility="collapsed")
 
     try:
-        headers = {
-            'Authorization': f'Bearer {st.secrets["KNOWLEDGE_API_KEY"]}',
-            'Content-Type': 'application/json'
-        }
-
-        response = requests.get(
-            f'{API_URL}/datasets/{st.session_state.dataset_id}/documents',
-            headers=headers,
-            params={'page': 1, 'limit': 1000}
-        )
-
-        if response.status_code == 200:
-            doc_list = response.json()
-            sorted_docs = sorted(doc_list['data'], key=lambda x: x['created_at'], reverse=True)
-
-            # 검색 필터링
-            if search_query:
-                sorted_docs = [doc for doc in sorted_docs if search_query.lower() in doc['name'].lower()]
-
-            for doc in sorted_docs:
+        # 세션 간 공유 캐시에서 정렬된 문서 리스트 조회
+        with instrumentation.span('sidebar.documents', plant=selected_plant):
+            sorted_docs = get_cached_documents(st.session_state.dataset_id)
+
+        # 색인 중인 문서는 백그라운드에서 상태를 확인해 다음 화면 갱신 때 반영
+        pending_count = indexing_tracker.pending_count(st.session_state.dataset_id)
+        if pending_count:
+            st.caption(f"⏳ 처리 중인 문서 {pending_count}개의 상태를 자동으로 확인하고 있습니다.")
+
+        # 검색 필터링 (데이터셋별 역색인 사용, 초성/접두어 검색 지원)
+        # 표시할 만큼만 찾고, 하나 더 찾아 더 있는지 확인
+        if search_query:
+            with instrumentation.span('sidebar.search', plant=selected_plant):
+                sorted_docs = search_documents(st.session_state.dataset_id, sorted_docs, search_query, limit=MAX_DOC_CARDS + 1)
+
+        with instrumentation.span('sidebar.render', plant=selected_plant):
+            if len(sorted_docs) > MAX_DOC_CARDS:
+                if search_query:
+                    st.caption(f"검색 결과 중 상위 {MAX_DOC_CARDS}개만 표시합니다. 검색어를 더 입력해 좁혀 보세요.")
+                else:
+                    st.caption(f"전체 {len(sorted_docs):,}개 중 최근 문서 {MAX_DOC_CARDS}개만 표시합니다. 다른 문서는 검색으로 찾을 수 있습니다.")
+            for doc in sorted_docs[:MAX_DOC_CARDS]:
                 status = "completed" if doc['indexing_status'] == 'completed' else "processing"
                 status_text = "완료" if status == "completed" else "처리 중"
                 status_class = "status-completed" if status == "completed" else "status-processing"
@@ -624,15 +753,15 @@ with st.sidebar:
     except Exception as e:
         st.error(f"오류 발생: {str(e)}")
 
-# 메인 화면에 대화 내용 표시
-if st.session_state.conversation_id in st.session_state.conversations:
-    for message in st.session_state.conversations[st.session_state.conversation_id]:
-        role = message['role']
-        timestamp = message.get('timestamp', datetime.now().strftime('%Y-%m-%d %H:%M'))
-        if role == 'user':
-            display_user_message(message['message'], timestamp)
-        else:
-            display_agent_message(message['message'], timestamp)
+# 메인 화면에 대화 내용 표시 (최근 메시지만 한 번에 그리고 이전 메시지는 요청 시 표시)
+history = get_history(st.session_state.conversation_id)
+if history['has_more'] or len(history['messages']) > history['window']:
+    if st.button("⬆️ 이전 메시지 더 보기", key="load_earlier"):
+        load_earlier_history(history)
+visible_messages = history['messages'][-history['window']:]
+if visible_messages:
+    with instrumentation.span('history.render', plant=selected_plant):
+        st.markdown(history_html(visible_messages), unsafe_allow_html=True)
 
 # 자동 스크롤 위한 요소 추가
 st.markdown('<div id="chat-end"></div>', unsafe_allow_html=True)
@@ -647,95 +776,104 @@ if (chatEnd) {
 
 # 사용자 입력 받기
 if prompt := st.chat_input("메시지를 입력하세요... (Enter를 눌러 전송)"):
-    # conversation_id가 유효한지 확인
-    if st.session_state.conversation_id not in st.session_state.conversations:
-        # 유효하지 않으면 새로운 대화 생성
-        new_chat_id = str(uuid.uuid4())
-        st.session_state.conversation_id = new_chat_id
-        st.session_state.conversations[new_chat_id] = []
-        st.session_state.recent_chats.insert(0, {
-            'id': new_chat_id,
-            'title': "새 대화",
-            'date': datetime.now().strftime('%Y-%m-%d'),
-            'messages': []
-        })
-        st.session_state['api_conversation_id'] = None  # API용 conversation_id 초기화
+    # 이전 답변이 아직 생성 중이면 중지하고 받은 부분까지 저장
+    previous_chat = st.session_state.get('chat_stream')
+    if previous_chat:
+        previous_chat['stream'].cancel()
+        # 중지된 답변이 새 질문보다 먼저 저장되도록 답변 스레드의 완료 처리를 기다림
+        previous_chat['stream'].wait(CHAT_CANCEL_TIMEOUT)
+        finalize_chat_stream(previous_chat)
 
     # 사용자 메시지 표시 및 저장
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
     display_user_message(prompt, timestamp)
-    st.session_state.conversations[st.session_state.conversation_id].append({
-        'role': 'user',
-        'message': prompt,
-        'timestamp': timestamp
-    })
-
-    # API 청 부분
-    assistant_placeholder = st.empty()
-    answer = ''
-
-    with st.spinner("답변을 생성 중입니다..."):
-        headers = {
-            'Authorization': f'Bearer {st.session_state.api_key}',
-            'Content-Type': 'application/json',
-        }
+    append_message(st.session_state.conversation_id, 'user', prompt, timestamp)
+
+    # 방금 정리한 이전 답변이 API conversation_id를 저장했을 수 있으므로 다시 조회
+    conversation = conversation_store.get_conversation(st.session_state.conversation_id)
+    api_conversation_id = conversation['api_conversation_id']
+
+    # 대화의 첫 질문(방금 저장한 질문이 유일한 메시지)만 답변 캐시를 사용
+    # (이후 질문은 앞의 맥락에 따라 답변이 달라지므로 캐시하지 않음)
+    cache_key = None
+    cached_answer = None
+    if conversation['message_count'] == 1:
+        cache_key = answer_cache.make_key(
+            prompt,
+            selected_plant,
+            st.session_state.dataset_id,
+            document_cache.version(st.session_state.dataset_id)
+        )
+        cached_answer = answer_cache.get(cache_key)
 
+    if cached_answer is not None:
+        # 캐시 적중 시 API는 호출하지 않음 (다음 질문을 보낼 때 이 질문/답변을 맥락으로 함께 보냄)
+        answer_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+        display_agent_message(cached_answer, answer_timestamp)
+        append_message(st.session_state.conversation_id, 'assistant', cached_answer, answer_timestamp)
+    else:
         data = {
-            'query': prompt,
+            'query': build_query(st.session_state.conversation_id, prompt, api_conversation_id),
             'response_mode': 'streaming',
-            'user': 'user-' + st.session_state.get('user_id', '123'),
+            'user': api_user,
             'inputs': {
                 'location': selected_plant  # 선택된 사업장 정보 추가
             },
             'dataset_id': st.session_state.dataset_id,
-            'conversation_id': st.session_state.get('api_conversation_id')  # API용 conversation_id 추가
-        }
-
-        try:
-            response = requests.post(
-                f'{API_URL}/chat-messages',
-                headers=headers,
-                json=data,
-                stream=True
-            )
-
-            if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        event_data = line.decode('utf-8')
-                        if event_data.startswith('data:'):
-                            json_data = event_data[5:].strip()
-                            try:
-                                event_json = json.loads(json_data)
-                                event = event_json.get('event')
-
-                                if event in ['message', 'agent_message']:
-                                    answer += event_json.get('answer', '')
-                                    escaped_answer = html.escape(answer)
-                                    assistant_placeholder.markdown(f"""
-                                    <div class="message agent-message">
-                                        <div class="message-content">
-                                            <div class="avatar">🤖</div>
-                                            <div class="text">{escaped_answer}</div>
-                                        </div>
-                                        <div class="message-timestamp">{datetime.now().strftime('%Y-%m-%d %H:%M')}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                elif event == 'message_end':
-                                    st.session_state.conversations[st.session_state.conversation_id].append({
-                                        'role': 'assistant',
-                                        'message': answer,
-                                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-                                    })
-                                    # API에서 conversation_id를 반환하면 저장
-                                    api_conv_id = event_json.get('conversation_id')
-                                    if api_conv_id:
-                                        st.session_state['api_conversation_id'] = api_conv_id
-                                    break
-                            except json.JSONDecodeError:
-                                continue
-            else:
-                st.error(f"⚠️ API 요청 실패: {response.status_code}")
-        except Exception as e:
-            st.error(f"⚠️ 오류 발생: {str(e)}")
-            st.write(f"Error details: {traceback.format_exc()}")
+            'conversation_id': api_conversation_id  # API용 conversation_id 추가
+        }
+
+        # API 요청 부분: 답변은 백그라운드 스레드에서 생성하고 화면은 버퍼를 읽어 표시
+        chat_conversation_id = st.session_state.conversation_id
+        st.session_state.chat_stream = {
+            'conversation_id': chat_conversation_id,
+            'stream': chat_engine.start_chat(
+                st.session_state.api_key,
+                data,
+                on_finished=lambda stream: save_chat_answer(stream, chat_conversation_id, cache_key)
+            ),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'),
+            'plant': selected_plant
+        }
+
+# 진행 중인 답변 표시 (사이드바 등을 조작해 다시 실행되어도 이어서 표시)
+active_chat = st.session_state.get('chat_stream')
+if active_chat:
+    stream = active_chat['stream']
+    if active_chat['conversation_id'] == st.session_state.conversation_id and not stream.done:
+        if st.button("⏹ 답변 중지", key="stop_generating"):
+            stream.cancel()
+
+        assistant_placeholder = st.empty()
+        status_placeholder = st.empty()
+        renderer = StreamRenderer(assistant_placeholder, active_chat['timestamp'])
+        offset = 0
+        shown_status = None
+        while not stream.done:
+            delta, offset = stream.read(offset)
+            renderer.feed(delta)
+            # 진행 표시를 주기적으로 갱신 (다른 위젯 조작 시 스크립트가 바로 재실행될 수 있도록)
+            elapsed_seconds = int(time.monotonic() - stream.started_at)
+            if (elapsed_seconds, stream.queue_position) != shown_status:
+                shown_status = (elapsed_seconds, stream.queue_position)
+                if stream.status == 'waiting':
+                    waiting = " (대기열에서 차례를 기다리는 중)"
+                elif stream.queue_position:
+                    waiting = f" (요청이 많아 대기열 {stream.queue_position}번째)"
+                else:
+                    waiting = ""
+                status_placeholder.caption(f"⏳ 답변을 생성 중입니다... {elapsed_seconds}초{waiting}")
+            time.sleep(CHAT_POLL_INTERVAL)
+        delta, offset = stream.read(offset)
+        renderer.feed(delta)
+        renderer.flush()
+        status_placeholder.empty()
+
+    if stream.done:
+        finalize_chat_stream(active_chat)
+
+# 관리자 토큰으로 접속한 경우에만 이번 실행의 구간별 시간과 운영 지표 표시 (?admin=<METRICS_ADMIN_TOKEN>)
+timings = instrumentation.finish_rerun(plant=selected_plant)
+if is_metrics_admin():
+    with st.sidebar:
+        show_timing_panel(timings)
@@ -0,0 +1,117 @@
+import io
+import os
+import tempfile
+import uuid
+
+# 업로드 파일을 읽는 단위 (바이트)
+CHUNK_SIZE = 256 * 1024
+
+# seek할 수 없는 파일을 임시 파일로 옮길 때 메모리에 둘 최대 크기
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def _quote(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\r', '%0D').replace('\n', '%0A')
+
+
+def _seekable(fileobj):
+    try:
+        return fileobj.seekable()
+    except AttributeError:
+        return hasattr(fileobj, 'seek') and hasattr(fileobj, 'tell')
+
+
+class MultipartEncoder:
+    """multipart/form-data 본문을 파일 청크 단위로 만들어 내보내는 파일형 객체
+
+    requests에 data로 넘기면 __len__으로 Content-Length를 정하고 read()로 본문을
+    조금씩 읽어 보내므로, 파일 전체를 메모리에 복사하지 않습니다.
+    재시도할 때는 seek(0)으로 처음부터 다시 보낼 수 있습니다.
+    """
+
+    def __init__(self, fields, file_field, file_name, fileobj,
+                 file_content_type='application/octet-stream', chunk_size=CHUNK_SIZE, progress_callback=None):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self._chunk_size = chunk_size
+        self._progress_callback = progress_callback
+
+        if not _seekable(fileobj):
+            fileobj = self._spool(fileobj)
+        self._file = fileobj
+        self._file.seek(0, os.SEEK_END)
+        self._file_size = self._file.tell()
+
+        head = []
+        for name, value in fields.items():
+            head.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        head.append(
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{_quote(file_field)}"; filename="{_quote(file_name)}"\r\n'
+            f'Content-Type: {file_content_type}\r\n\r\n'
+        )
+        self._head = ''.join(head).encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self._length = len(self._head) + self._file_size + len(self._tail)
+        self.seek(0)
+
+    def _spool(self, fileobj):
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        while True:
+            chunk = fileobj.read(self._chunk_size)
+            if not chunk:
+                break
+            spooled.write(chunk)
+        return spooled
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """처음 위치로만 되돌릴 수 있음 (재시도용)"""
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartEncoder는 처음 위치로만 이동할 수 있습니다.")
+        self._position = 0
+        self._file.seek(0)
+        return 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length - self._position
+
+        parts = []
+        remaining = size
+        while remaining > 0 and self._position < self._length:
+            position = self._position
+            file_start = len(self._head)
+            file_end = file_start + self._file_size
+            if position < file_start:
+                data = self._head[position:position + remaining]
+            elif position < file_end:
+                data = self._file.read(min(remaining, file_end - position))
+                if not data:
+                    raise IOError("업로드 중 파일 크기가 바뀌었습니다.")
+            else:
+                offset = position - file_end
+                data = self._tail[offset:offset + remaining]
+            parts.append(data)
+            self._position += len(data)
+            remaining -= len(data)
+
+        if parts and self._progress_callback is not None:
+            self._progress_callback(self._position, self._length)
+        return b''.join(parts) if len(parts) != 1 else parts[0]
@@ -0,0 +1,107 @@
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import PyPDF2
+
+# 이 크기/페이지 수 미만의 PDF는 프로세스 풀을 쓰지 않고 직렬로 추출
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+PARALLEL_MIN_PAGES = 16
+
+# 워커 하나가 한 번에 처리하는 최소 페이지 수
+MIN_PAGES_PER_TASK = 4
+
+MAX_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 서버는 멀티스레드 프로세스이므로 fork 대신 spawn 사용
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(path, start, end):
+    # 워커 프로세스에서 실행: 지정한 페이지 범위의 텍스트 추출
+    with open(path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or '' for i in range(start, end)]
+
+
+def _page_ranges(page_count):
+    size = max(MIN_PAGES_PER_TASK, math.ceil(page_count / (MAX_WORKERS * 4)))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def iter_pdf_pages(fileobj):
+    """PDF 페이지별 텍스트를 순서대로 반환하는 제너레이터 (직렬)"""
+    pdf_reader = PyPDF2.PdfReader(fileobj)
+    for page in pdf_reader.pages:
+        yield page.extract_text() or ''
+
+
+def extract_pdf_pages(fileobj, size, progress_callback=None):
+    """PDF 페이지 텍스트 리스트를 반환하는 함수
+
+    큰 파일은 페이지 범위로 나누어 프로세스 풀에서 병렬 추출한 뒤 순서대로 재조립하고,
+    범위가 끝날 때마다 progress_callback(완료 페이지 수, 전체 페이지 수)을 호출합니다.
+    """
+    fileobj.seek(0)
+    if size < PARALLEL_MIN_BYTES or MAX_WORKERS < 2:
+        return list(iter_pdf_pages(fileobj))
+
+    page_count = len(PyPDF2.PdfReader(fileobj).pages)
+    if page_count < PARALLEL_MIN_PAGES:
+        fileobj.seek(0)
+        return list(iter_pdf_pages(fileobj))
+
+    # 워커에는 파일 경로만 전달하여 대용량 바이트를 작업마다 직렬화하지 않음
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        tmp.write(fileobj.getbuffer() if hasattr(fileobj, 'getbuffer') else fileobj.read())
+        path = tmp.name
+
+    try:
+        pages = [None] * page_count
+        done = 0
+        try:
+            pool = _get_pool()
+            futures = {
+                pool.submit(_extract_page_range, path, start, end): start
+                for start, end in _page_ranges(page_count)
+            }
+            for future in as_completed(futures):
+                start = futures[future]
+                texts = future.result()
+                pages[start:start + len(texts)] = texts
+                done += len(texts)
+                if progress_callback:
+                    progress_callback(done, page_count)
+        except BrokenProcessPool:
+            # 워커가 비정상 종료되면 풀을 재생성하고 직렬 추출로 대체
+            _reset_pool()
+            fileobj.seek(0)
+            return list(iter_pdf_pages(fileobj))
+        return pages
+    finally:
+        os.unlink(path)
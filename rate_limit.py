@@ -0,0 +1,177 @@
+import bisect
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+# API 키별 초당 요청 수와 순간 최대 요청 수 (환경 변수로 조정 가능)
+RATE = float(os.environ.get('MIR_API_RATE', 5))
+BURST = float(os.environ.get('MIR_API_BURST', 10))
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITIES = {
+    'chat': 0,
+    'documents': 1,
+    'ingestion': 2,
+}
+
+# api_client 엔드포인트별 우선순위
+ENDPOINT_PRIORITIES = {
+    'chat': 'chat',
+    'documents': 'documents',
+    'default': 'documents',
+    'workflow_stream': 'ingestion',
+    'upload': 'ingestion',
+}
+
+# 우선순위별 최대 대기 시간 (초)
+MAX_WAIT = {
+    'chat': 30,
+    'documents': 15,
+    'ingestion': 300,
+}
+
+# 대량 작업이 쓰지 않고 남겨 두는 토큰 비율 (대화형 요청이 바로 처리되도록)
+RESERVE = {
+    'chat': 0.0,
+    'documents': 0.0,
+    'ingestion': 0.3,
+}
+
+
+class RateLimitTimeout(Exception):
+    """최대 대기 시간 안에 요청 차례가 오지 않았을 때 발생하는 예외"""
+
+    def __init__(self, priority_class, waited):
+        super().__init__(f"요청이 많아 {waited:.0f}초 동안 차례를 받지 못했습니다. 잠시 후 다시 시도해 주세요.")
+        self.priority_class = priority_class
+        self.waited = waited
+
+
+def _check_limits(rate, burst):
+    # 토큰이 채워지지 않거나 한 개도 모이지 않는 설정은 모든 요청이 최대 대기 시간까지 멈추므로 거부
+    if rate <= 0 or burst < 1:
+        raise ValueError(f"요청 제한 설정이 올바르지 않습니다 (MIR_API_RATE > 0, MIR_API_BURST >= 1): rate={rate}, burst={burst}")
+
+
+class TokenBucket:
+    """우선순위 대기열이 있는 토큰 버킷
+
+    토큰은 초당 rate개씩 burst개까지 채워집니다. 대기 중인 요청은 우선순위, 도착
+    순서대로 줄을 서고 맨 앞의 요청만 토큰을 가져갈 수 있으므로, 대량 작업이 줄을
+    서 있어도 나중에 온 채팅 요청이 먼저 처리됩니다.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST):
+        _check_limits(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.queued = 0
+        self.timeouts = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority_class='documents', timeout=None, queue_callback=None):
+        """토큰을 하나 가져오는 함수 (차례를 기다리는 동안 queue_callback(대기 순번) 호출)
+
+        대기가 끝나면 queue_callback(0)을 호출하고, timeout(기본값은 우선순위별
+        최대 대기 시간) 안에 차례가 오지 않으면 RateLimitTimeout을 발생시킵니다.
+        queue_callback은 잠금을 잡은 채 호출되므로 값만 기록하는 짧은 함수여야 합니다.
+        """
+        # burst가 작아도 대량 작업이 토큰을 가져갈 수 있도록 남겨 두는 양은 burst - 1 이하로 제한
+        floor = min(self.burst * RESERVE[priority_class], self.burst - 1)
+        started = time.monotonic()
+        deadline = started + (MAX_WAIT[priority_class] if timeout is None else timeout)
+        entry = (PRIORITIES[priority_class], next(self._seq))
+        reported = None
+        with self._cond:
+            bisect.insort(self._waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    position = self._waiters.index(entry)
+                    if position == 0 and now >= self._paused_until and self._tokens - 1 >= floor:
+                        self._tokens -= 1
+                        self.admitted += 1
+                        break
+                    if now >= deadline:
+                        self.timeouts += 1
+                        raise RateLimitTimeout(priority_class, now - started)
+                    if reported is None:
+                        self.queued += 1
+                    if queue_callback and position + 1 != reported:
+                        queue_callback(position + 1)
+                    reported = position + 1
+                    if position == 0:
+                        # 토큰이 채워지거나 일시 정지가 끝날 때까지 대기
+                        wait = max(self._paused_until - now, (floor + 1 - self._tokens) / self.rate, 0.001)
+                    else:
+                        # 앞의 요청이 빠지면 notify_all로 깨어남
+                        wait = deadline - now
+                    self._cond.wait(min(wait, deadline - now))
+            finally:
+                self._waiters.remove(entry)
+                self._cond.notify_all()
+        if queue_callback and reported:
+            queue_callback(0)
+
+    def pause(self, seconds):
+        """429 응답 등으로 seconds초 동안 새 요청을 보내지 않도록 하는 함수"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'tokens': round(self._tokens, 1),
+                'waiting': len(self._waiters),
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'timeouts': self.timeouts,
+            }
+
+
+class RateLimiter:
+    """API 키마다 토큰 버킷을 하나씩 두는 프로세스 전체 요청 제한기"""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        _check_limits(rate, burst)
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def bucket(self, api_key):
+        # API 키 원문 대신 해시로 구분
+        scope = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        with self._lock:
+            bucket = self._buckets.get(scope)
+            if bucket is None:
+                bucket = self._buckets[scope] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, api_key, endpoint='default', queue_callback=None):
+        """엔드포인트의 우선순위로 API 키의 토큰을 하나 가져오는 함수"""
+        priority_class = ENDPOINT_PRIORITIES.get(endpoint, 'documents')
+        self.bucket(api_key).acquire(priority_class, queue_callback=queue_callback)
+
+    def pause(self, api_key, seconds):
+        self.bucket(api_key).pause(seconds)
+
+    def stats(self):
+        """키 해시별 버킷 상태를 반환하는 함수"""
+        with self._lock:
+            buckets = list(self._buckets.items())
+        return {scope: bucket.stats() for scope, bucket in buckets}
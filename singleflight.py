@@ -0,0 +1,63 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나의 실행으로 합치는 객체
+
+    먼저 들어온 호출(리더)만 함수를 실행하고, 실행 중에 같은 키로 들어온 호출은
+    리더의 결과를 그대로 받습니다. 리더가 예외를 던지면 기다리던 호출에도 같은
+    예외가 전달됩니다. 실행이 끝나면 키가 지워지므로 결과를 캐시하지는 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, func):
+        """key로 진행 중인 호출이 있으면 그 결과를, 없으면 func()를 실행한 결과를 반환하는 함수"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """실행 횟수, 합쳐져 절약된 호출 수, 진행 중인 키 수를 반환하는 함수"""
+        with self._lock:
+            total = self.executed + self.shared
+            return {
+                'executed': self.executed,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+                'saved_rate': self.shared / total if total else 0.0,
+            }
@@ -0,0 +1,150 @@
+import json
+
+try:
+    # 설치되어 있으면 더 빠른 JSON 디코더 사용
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    _JSON_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+# mir-api 스트리밍 이벤트 종류
+MESSAGE = 'message'
+AGENT_MESSAGE = 'agent_message'
+AGENT_THOUGHT = 'agent_thought'
+MESSAGE_END = 'message_end'
+ERROR = 'error'
+PING = 'ping'
+
+
+class ServerSentEvent:
+    """SSE 이벤트 하나 (event, data, id, retry 필드)"""
+
+    __slots__ = ('event', 'data', 'id', 'retry')
+
+    def __init__(self, event, data, id=None, retry=None):
+        self.event = event
+        self.data = data
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self):
+        return f'ServerSentEvent(event={self.event!r}, data={self.data!r}, id={self.id!r})'
+
+
+class SSEParser:
+    """바이트 청크를 받아 SSE 이벤트를 만드는 증분 파서 (WHATWG EventSource 규칙)
+
+    청크 경계에서 잘린 줄은 재사용 버퍼에 남겨 두었다가 다음 청크와 이어서 처리하고,
+    여러 줄의 data 필드는 줄바꿈으로 이어 붙입니다.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._data = []
+        self._event = ''
+        self._retry = None
+        self.last_event_id = None
+
+    def feed(self, chunk):
+        """바이트 청크를 처리하고 완성된 이벤트 목록을 반환하는 함수"""
+        buffer = self._buffer
+        buffer += chunk
+        events = []
+        start = 0
+        length = len(buffer)
+        while start < length:
+            newline = buffer.find(b'\n', start)
+            carriage = buffer.find(b'\r', start, newline if newline >= 0 else length)
+            if carriage >= 0:
+                end = carriage
+                # 청크 끝의 \r은 \r\n의 앞부분일 수 있으므로 다음 청크를 기다림
+                if carriage + 1 == length:
+                    break
+                next_start = carriage + 2 if buffer[carriage + 1] == 0x0A else carriage + 1
+            elif newline >= 0:
+                end = newline
+                next_start = newline + 1
+            else:
+                break
+            event = self._process_line(buffer[start:end])
+            if event is not None:
+                events.append(event)
+            start = next_start
+        del buffer[:start]
+        return events
+
+    def _process_line(self, line):
+        if not line:
+            return self._dispatch()
+        if line[0] == 0x3A:  # ':' 로 시작하는 주석 줄
+            return None
+        colon = line.find(b':')
+        if colon < 0:
+            field, value = bytes(line), b''
+        else:
+            field = bytes(line[:colon])
+            value = line[colon + 1:]
+            if value[:1] == b' ':
+                value = value[1:]
+        if field == b'data':
+            self._data.append(value.decode('utf-8'))
+        elif field == b'event':
+            self._event = value.decode('utf-8')
+        elif field == b'id':
+            if b'\0' not in value:
+                self.last_event_id = value.decode('utf-8')
+        elif field == b'retry':
+            if value.isdigit():
+                self._retry = int(value)
+        return None
+
+    def _dispatch(self):
+        if not self._data:
+            # data 없는 이벤트는 버림 (event 필드만 초기화)
+            self._event = ''
+            return None
+        event = ServerSentEvent(
+            self._event or MESSAGE,
+            '\n'.join(self._data),
+            self.last_event_id,
+            self._retry
+        )
+        self._data = []
+        self._event = ''
+        return event
+
+
+def iter_sse(response):
+    """스트리밍 응답을 도착하는 대로 읽어 SSE 이벤트를 반환하는 제너레이터"""
+    parser = SSEParser()
+    for chunk in response.iter_content(chunk_size=None):
+        yield from parser.feed(chunk)
+    # 마지막 빈 줄 없이 끝난 이벤트 처리
+    yield from parser.feed(b'\n\n')
+
+
+def iter_json_events(response):
+    """SSE data의 JSON을 디코딩하여 (이벤트 종류, 내용) 쌍을 반환하는 제너레이터
+
+    이벤트 종류는 JSON의 'event' 값을 우선 사용하며, ping과 JSON이 아닌 이벤트는 건너뜁니다.
+    """
+    for sse_event in iter_sse(response):
+        if sse_event.event == PING:
+            continue
+        try:
+            payload = _loads(sse_event.data)
+        except _JSON_ERRORS:
+            continue
+        if not isinstance(payload, dict):
+            continue
+        event = payload.get('event') or sse_event.event
+        if event == PING:
+            continue
+        yield event, payload
@@ -0,0 +1,85 @@
+import csv
+import io
+import math
+
+# 행 블록 사이에 넣는 데이터셋 세그먼트 구분자
+SEGMENT_SEPARATOR = '\n####\n'
+
+# CSV 인코딩 시도 순서 (엑셀에서 저장한 한글 CSV는 보통 cp949)
+CSV_ENCODINGS = ('utf-8-sig', 'cp949')
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+
+def iter_row_blocks(rows, sheet_name=None):
+    """표의 첫 번째 비어 있지 않은 행을 머리글로 보고 행마다 '열: 값' 블록을 만드는 제너레이터"""
+    header = None
+    for row_number, row in enumerate(rows, start=1):
+        cells = [_cell_text(value) for value in row]
+        if not any(cells):
+            continue
+        if header is None:
+            header = [cell or f"열{i + 1}" for i, cell in enumerate(cells)]
+            continue
+
+        location = f"행 {row_number}" if sheet_name is None else f"{sheet_name} / 행 {row_number}"
+        lines = [f"[{location}]"]
+        for i, cell in enumerate(cells):
+            if cell:
+                key = header[i] if i < len(header) else f"열{i + 1}"
+                lines.append(f"{key}: {cell}")
+        yield '\n'.join(lines)
+
+
+def _iter_csv_blocks(fileobj, encoding):
+    fileobj.seek(0)
+    text = io.TextIOWrapper(fileobj, encoding=encoding, newline='')
+    try:
+        yield from iter_row_blocks(csv.reader(text))
+    finally:
+        # 래퍼가 정리될 때 원본 버퍼까지 닫지 않도록 분리
+        text.detach()
+
+
+def csv_to_text(fileobj):
+    """CSV를 한 줄씩 읽어 행 블록 텍스트로 변환하는 함수 (utf-8 실패 시 cp949)"""
+    for encoding in CSV_ENCODINGS[:-1]:
+        try:
+            return SEGMENT_SEPARATOR.join(_iter_csv_blocks(fileobj, encoding))
+        except UnicodeDecodeError:
+            continue
+    return SEGMENT_SEPARATOR.join(_iter_csv_blocks(fileobj, CSV_ENCODINGS[-1]))
+
+
+def xlsx_to_text(openpyxl, fileobj):
+    """XLSX의 모든 시트를 읽기 전용 모드로 한 행씩 읽어 행 블록 텍스트로 변환하는 함수"""
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        return SEGMENT_SEPARATOR.join(
+            block
+            for sheet in workbook.worksheets
+            for block in iter_row_blocks(sheet.iter_rows(values_only=True), sheet.title)
+        )
+    finally:
+        workbook.close()
+
+
+def xls_to_text(pd, fileobj):
+    """XLS의 모든 시트를 시트 단위로 읽어 행 블록 텍스트로 변환하는 함수"""
+    # 구형 XLS는 스트리밍 리더가 없으므로 한 번에 한 시트만 메모리에 올림
+    with pd.ExcelFile(fileobj) as workbook:
+        blocks = []
+        for sheet_name in workbook.sheet_names:
+            df = workbook.parse(sheet_name, header=None, dtype=object)
+            blocks.extend(iter_row_blocks(df.itertuples(index=False, name=None), sheet_name))
+            del df
+        return SEGMENT_SEPARATOR.join(blocks)
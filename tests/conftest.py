@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 테스트에서 최상위 모듈(sse, text_chunker 등)을 바로 import할 수 있도록 저장소 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
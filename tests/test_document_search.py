@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+import document_search
+from document_search import DocumentIndex, search_documents, substring_search, to_chosung, tokenize
+
+WORDS = ['급수펌프', '점검', '보고서', '터빈', '발전기', '정비', '일지', 'FeedPump', 'manual', 'rev2', 'boiler', 'ABC123']
+
+
+def make_docs(names):
+    # created_at이 클수록 최신 (목록은 created_at 역순)
+    docs = [{'id': f'doc-{i}', 'name': name, 'created_at': 1000 + i} for i, name in enumerate(names)]
+    return sorted(docs, key=lambda doc: doc['created_at'], reverse=True)
+
+
+def random_docs(rng, count):
+    names = []
+    for _ in range(count):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        names.append(rng.choice([' ', '_', '-', '']).join(words) + rng.choice(['.pdf', '.docx', '']))
+    return make_docs(names)
+
+
+def names(docs):
+    return [doc['name'] for doc in docs]
+
+
+def test_tokenize_and_chosung():
+    assert tokenize('FeedPump_v2 급수펌프(점검).pdf') == ['feedpump', 'v2', '급수펌프', '점검', 'pdf']
+    assert to_chosung('급수펌프') == 'ㄱㅅㅍㅍ'
+    assert to_chosung('ㄱ수') == 'ㄱㅅ'
+    assert to_chosung('pump') is None
+
+
+def test_chosung_query():
+    index = DocumentIndex()
+    index.build(make_docs(['급수펌프 점검.pdf', '터빈 정비 일지.docx', 'boiler.pdf']))
+    assert names(index.search('ㄱㅅㅍㅍ')) == ['급수펌프 점검.pdf']
+    assert names(index.search('ㅈㄱ')) == ['급수펌프 점검.pdf']
+    # 복합어 중간의 초성도 검색됨
+    assert names(index.search('ㅍㅍ')) == ['급수펌프 점검.pdf']
+    assert names(index.search('ㅌㅂ ㅇㅈ')) == ['터빈 정비 일지.docx']
+
+
+def test_prefix_and_middle_of_compound_word():
+    index = DocumentIndex()
+    index.build(make_docs(['FeedPump manual.pdf', 'feed water.pdf', '급수펌프.pdf']))
+    assert set(names(index.search('feed'))) == {'FeedPump manual.pdf', 'feed water.pdf'}
+    assert names(index.search('pump')) == ['FeedPump manual.pdf']
+    assert names(index.search('펌')) == ['급수펌프.pdf']
+    # 모든 토큰이 일치해야 함
+    assert names(index.search('feed man')) == ['FeedPump manual.pdf']
+    assert index.search('feed boiler') == []
+
+
+def test_ranking_prefers_exact_word_then_newer():
+    index = DocumentIndex()
+    index.build(make_docs(['pumping.pdf', 'FeedPump.pdf', 'pump.pdf', 'pump old.pdf']))
+    # make_docs는 뒤에 올수록 최신: 'pump old'가 'pump'보다 최신
+    assert names(index.search('pump')) == ['pump old.pdf', 'pump.pdf', 'pumping.pdf', 'FeedPump.pdf']
+
+
+def test_sync_applies_rename_and_removal():
+    docs = make_docs(['boiler.pdf', 'turbine.pdf'])
+    index = DocumentIndex()
+    index.build(docs)
+    renamed = [dict(docs[0], name='generator.pdf'), docs[1]]
+    index.sync(renamed)
+    assert names(index.search('generator')) == ['generator.pdf']
+    assert index.search('turbine') == []
+    index.sync(renamed[:1])
+    assert len(index) == 1
+    assert index.search('boiler') == []
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_indexed_search_covers_substring_search(seed):
+    # 토큰 안의 부분 문자열 검색어는 색인 검색 결과가 부분 문자열 검색 결과를 모두 포함해야 함
+    rng = random.Random(seed)
+    docs = random_docs(rng, 300)
+    index = DocumentIndex()
+    index.build(docs)
+    for _ in range(50):
+        token = rng.choice(tokenize(rng.choice(docs)['name']))
+        start = rng.randrange(len(token))
+        query = token[start:rng.randint(start + 1, len(token))]
+        expected = {doc['id'] for doc in substring_search(docs, query)}
+        found = {doc['id'] for doc in index.search(query)}
+        assert expected
+        assert expected <= found, query
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_limited_search_matches_full_ranking(seed):
+    rng = random.Random(seed)
+    docs = random_docs(rng, 300)
+    index = DocumentIndex()
+    index.build(docs)
+    queries = ['ㄱ', 'ㅂ', 'p', 'f', 'r', '2'] + [rng.choice(WORDS).lower()[:rng.randint(1, 3)] for _ in range(20)]
+    for query in queries:
+        full = index.search(query)
+        for limit in (1, 5, 51):
+            assert index.search(query, limit=limit) == full[:limit], (query, limit)
+
+
+def test_multi_token_limited_search_matches_full_ranking():
+    docs = random_docs(random.Random(0), 300)
+    index = DocumentIndex()
+    index.build(docs)
+    for query in ['급 점', 'feed m', 'ㅂ ㄱ']:
+        assert index.search(query, limit=5) == index.search(query)[:5]
+
+
+def test_search_documents_falls_back_to_substring_search():
+    long_token = 'a1b2c3d4' * 6
+    docs = make_docs([f'{long_token}.pdf', 'C++ guide.pdf', 'boiler.pdf'])
+    dataset_id = 'test-fallback'
+    # 긴 토큰(접미사 미색인)의 중간 부분과 기호만 있는 검색어는 부분 문자열 검색으로 찾음
+    assert names(search_documents(dataset_id, docs, long_token[10:20])) == [f'{long_token}.pdf']
+    assert names(search_documents(dataset_id, docs, '++')) == ['C++ guide.pdf']
+    assert names(search_documents(dataset_id, docs, 'boil', limit=1)) == ['boiler.pdf']
+    assert search_documents(dataset_id, docs, 'missing') == []
+    assert document_search.get_index(dataset_id) is document_search.get_index(dataset_id)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimitTimeout, TokenBucket
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_waiters_are_admitted_in_priority_order():
+    bucket = TokenBucket(rate=20, burst=1)
+    bucket.acquire('chat')
+    admitted = []
+
+    def request(priority_class):
+        bucket.acquire(priority_class, timeout=5)
+        admitted.append(priority_class)
+
+    # 대량 작업이 먼저 줄을 서도 나중에 온 채팅이 먼저 처리됨
+    threads = []
+    for waiting, priority_class in enumerate(['ingestion', 'documents', 'chat'], 1):
+        thread = threading.Thread(target=request, args=(priority_class,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: bucket.stats()['waiting'] == waiting)
+    for thread in threads:
+        thread.join(5)
+
+    assert admitted == ['chat', 'documents', 'ingestion']
+
+
+def test_queue_callback_reports_position_then_zero():
+    bucket = TokenBucket(rate=20, burst=1)
+    bucket.acquire('chat')
+    positions = []
+    bucket.acquire('chat', timeout=5, queue_callback=positions.append)
+    assert positions == [1, 0]
+
+
+def test_timeout_raises_and_leaves_queue():
+    bucket = TokenBucket(rate=0.01, burst=1)
+    bucket.acquire('documents')
+    started = time.monotonic()
+    with pytest.raises(RateLimitTimeout) as excinfo:
+        bucket.acquire('documents', timeout=0.1)
+    assert 0.1 <= time.monotonic() - started < 1
+    assert excinfo.value.priority_class == 'documents'
+    stats = bucket.stats()
+    assert stats['timeouts'] == 1
+    assert stats['waiting'] == 0
+
+
+def test_ingestion_leaves_reserve_for_chat():
+    bucket = TokenBucket(rate=0.001, burst=10)
+    for _ in range(7):
+        bucket.acquire('ingestion', timeout=0)
+    # 여유분(burst의 30%)은 대량 작업이 가져가지 못함
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire('ingestion', timeout=0.05)
+    for _ in range(3):
+        bucket.acquire('chat', timeout=0)
+
+
+def test_ingestion_is_admitted_with_burst_of_one():
+    bucket = TokenBucket(rate=100, burst=1)
+    for _ in range(3):
+        bucket.acquire('ingestion', timeout=1)
+
+
+@pytest.mark.parametrize('rate, burst', [(0, 10), (-1, 10), (5, 0.5), (5, 0)])
+def test_invalid_limits_are_rejected(rate, burst):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, burst=burst)
+    with pytest.raises(ValueError):
+        rate_limit.RateLimiter(rate=rate, burst=burst)
+
+
+def test_limiter_uses_endpoint_priority_and_one_bucket_per_key():
+    limiter = rate_limit.RateLimiter(rate=0.001, burst=10)
+    for _ in range(7):
+        limiter.acquire('key-a', endpoint='upload')
+    assert limiter.bucket('key-a') is limiter.bucket('key-a')
+    assert limiter.bucket('key-a') is not limiter.bucket('key-b')
+    stats = limiter.stats()
+    assert len(stats) == 2
+    assert all('key-a' not in scope for scope in stats)
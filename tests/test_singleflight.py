@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def run_concurrently(flight, key, func, followers=4):
+    # 리더가 func 안에서 멈춰 있는 동안 같은 키로 followers개의 호출을 더 보냄
+    release = threading.Event()
+    results = [None] * (followers + 1)
+
+    def leader_func():
+        release.wait(5)
+        return func()
+
+    def call(i, target):
+        try:
+            results[i] = ('ok', flight.do(key, target))
+        except Exception as e:
+            results[i] = ('error', e)
+
+    threads = [threading.Thread(target=call, args=(0, leader_func))]
+    threads[0].start()
+    wait_until(lambda: flight.stats()['in_flight'] == 1)
+    for i in range(1, followers + 1):
+        threads.append(threading.Thread(target=call, args=(i, func)))
+        threads[-1].start()
+    wait_until(lambda: flight.stats()['shared'] == followers)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {'documents': [1, 2, 3]}
+
+    results = run_concurrently(flight, 'dataset', fetch)
+
+    assert len(calls) == 1
+    assert all(status == 'ok' for status, _ in results)
+    assert all(value is results[0][1] for _, value in results)
+    stats = flight.stats()
+    assert stats == {'executed': 1, 'shared': 4, 'in_flight': 0, 'saved_rate': 0.8}
+
+
+def test_leader_exception_is_propagated_to_waiters():
+    flight = SingleFlight()
+    error = RuntimeError('upstream failed')
+
+    def fetch():
+        raise error
+
+    results = run_concurrently(flight, 'dataset', fetch)
+
+    assert all(status == 'error' and value is error for status, value in results)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_result_is_not_cached_after_completion():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.do('key', lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: int('x'))
+    assert flight.do('key', lambda: 3) == 3
+    assert flight.stats()['executed'] == 4
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 'a') == 'a'
+    assert flight.do('b', lambda: 'b') == 'b'
+    assert flight.stats()['shared'] == 0
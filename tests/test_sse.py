@@ -0,0 +1,69 @@
+import sse
+
+
+class FakeResponse:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def iter_content(self, chunk_size=None):
+        return iter(self._chunks)
+
+
+def feed_all(chunks):
+    parser = sse.SSEParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+def test_crlf_split_across_chunks():
+    # \r 뒤에서 잘린 \r\n이 빈 줄(이벤트 끝)로 두 번 처리되지 않아야 함
+    events = feed_all([b'event: message\r', b'\ndata: {"answer": "a"}\r', b'\n\r', b'\n'])
+    assert len(events) == 1
+    assert events[0].event == 'message'
+    assert events[0].data == '{"answer": "a"}'
+
+
+def test_crlf_split_at_every_byte():
+    stream = b'data: first\r\n\r\ndata: second\r\rdata: third\n\n'
+    events = feed_all([stream[i:i + 1] for i in range(len(stream))])
+    assert [event.data for event in events] == ['first', 'second', 'third']
+
+
+def test_utf8_split_across_chunks():
+    data = 'data: 급수펌프\n\n'.encode('utf-8')
+    events = feed_all([data[:8], data[8:]])
+    assert events[0].data == '급수펌프'
+
+
+def test_multiline_data_joined_with_newline():
+    events = feed_all([b'data: line1\ndata:line2\ndata: \n\n'])
+    assert len(events) == 1
+    assert events[0].data == 'line1\nline2\n'
+
+
+def test_comment_and_event_without_data_are_ignored():
+    events = feed_all([b': keep-alive\n\nevent: message\n\nid: 7\ndata: x\n\n'])
+    assert len(events) == 1
+    assert events[0].event == 'message'
+    assert events[0].id == '7'
+
+
+def test_iter_sse_dispatches_event_without_trailing_blank_line():
+    events = list(sse.iter_sse(FakeResponse([b'data: last'])))
+    assert [event.data for event in events] == ['last']
+
+
+def test_iter_json_events_skips_ping():
+    response = FakeResponse([
+        b'event: ping\ndata: {}\n\n',
+        b'data: {"event": "ping"}\n\n',
+        b'data: not json\n\n',
+        b'data: {"event": "message", "answer": "hi"}\n\n',
+        b'data: {"event": "message_end", "conversation_id": "c1"}\n\n',
+    ])
+    events = list(sse.iter_json_events(response))
+    assert [event for event, _ in events] == [sse.MESSAGE, sse.MESSAGE_END]
+    assert events[0][1]['answer'] == 'hi'
+    assert events[1][1]['conversation_id'] == 'c1'
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+import text_chunker
+from text_chunker import PAGE_BREAK, split_text
+
+
+def random_document(rng, length):
+    # 구분자, 페이지, 제목, 문단, 줄 경계와 경계 없는 긴 줄이 섞인 문서
+    parts = []
+    size = 0
+    while size < length:
+        kind = rng.random()
+        if kind < 0.05:
+            part = '####'
+        elif kind < 0.1:
+            part = PAGE_BREAK
+        elif kind < 0.2:
+            part = f'\n## 제목 {rng.randint(1, 99)}\n'
+        elif kind < 0.3:
+            part = f'\n제{rng.randint(1, 20)}조 조항\n'
+        elif kind < 0.5:
+            part = '\n\n'
+        elif kind < 0.55:
+            part = 'x' * rng.randint(1000, 20000)
+        else:
+            part = '급수펌프 점검 기록 ' * rng.randint(1, 40) + '\n'
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts)
+
+
+def test_short_text_is_single_chunk():
+    assert split_text('짧은 문서', max_chars=100, min_chars=20) == ['짧은 문서']
+    assert split_text('', max_chars=100, min_chars=20) == ['']
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_round_trip_and_chunk_sizes(seed):
+    rng = random.Random(seed)
+    max_chars = rng.choice([500, 2000, 12000])
+    min_chars = rng.choice([0, max_chars // 10, max_chars // 4, max_chars])
+    text = random_document(rng, rng.randint(1, max_chars * 8))
+
+    chunks = split_text(text, max_chars=max_chars, min_chars=min_chars)
+
+    assert ''.join(chunks) == text
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    if len(chunks) > 1:
+        # min_chars는 max_chars // 2까지로 제한됨
+        assert all(len(chunk) >= min(min_chars, max_chars // 2) for chunk in chunks)
+
+
+def test_small_sections_are_merged_up_to_min_size():
+    # 짧은 제목 구간이 많아도 청크마다 워크플로우를 실행할 만큼 작게 나누지 않음
+    text = ''.join(f'## 절 {i}\n' + '내용 ' * 50 + '\n' for i in range(200))
+    chunks = split_text(text, max_chars=3000, min_chars=1000)
+    assert ''.join(chunks) == text
+    assert len(chunks) > 1
+    assert all(1000 <= len(chunk) <= 3000 for chunk in chunks)
+
+
+def test_prefers_structural_boundaries():
+    first = '# 1장\n' + 'a' * 700 + '\n'
+    second = '# 2장\n' + 'b' * 700 + '\n'
+    chunks = split_text(first + second, max_chars=1000, min_chars=500)
+    assert chunks == [first, second]
+
+
+def test_strip_page_breaks():
+    assert text_chunker.strip_page_breaks(f'1쪽{PAGE_BREAK}2쪽') == '1쪽2쪽'
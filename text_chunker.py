@@ -0,0 +1,100 @@
+import re
+
+# 청크 최대 길이 (문자 수)
+CHUNK_MAX_CHARS = 12000
+
+# 청크 최소 길이 (문자 수). 청크마다 워크플로우를 한 번씩 실행하므로 너무 짧은 청크는 앞뒤와 합침
+CHUNK_MIN_CHARS = 2000
+
+# PDF 페이지 사이에 넣는 구분자
+PAGE_BREAK = '\f'
+
+# 우선순위 순서의 분할 경계 패턴 (매치가 끝나는 위치에서 자름)
+BOUNDARY_PATTERNS = [
+    re.compile(r'(?=####)'),                                              # 데이터셋 세그먼트 구분자
+    re.compile(PAGE_BREAK),                                               # 페이지
+    re.compile(r'(?m)^(?=#{1,6}\s)'),                                     # 마크다운 제목
+    re.compile(r'(?m)^(?=(?:제\s*\d+\s*[장절조]|\d+(?:\.\d+)*\.?\s+\S))'),   # 번호 제목
+    re.compile(r'\n[ \t]*\n'),                                            # 문단
+    re.compile(r'\n'),                                                    # 줄
+]
+
+
+def _split_at(text, pattern):
+    cuts = [m.end() for m in pattern.finditer(text) if 0 < m.end() < len(text)]
+    pieces = []
+    start = 0
+    for cut in cuts:
+        if cut > start:
+            pieces.append(text[start:cut])
+            start = cut
+    pieces.append(text[start:])
+    return pieces
+
+
+def _pieces(text, max_chars, level):
+    # 경계 단위 조각 목록 (최대 길이를 넘는 조각은 다음 경계로 나누고, 더 나눌 경계가 없으면 그대로 둠)
+    if len(text) <= max_chars or level >= len(BOUNDARY_PATTERNS):
+        return [text]
+    pieces = []
+    for piece in _split_at(text, BOUNDARY_PATTERNS[level]):
+        if len(piece) > max_chars:
+            pieces.extend(_pieces(piece, max_chars, level + 1))
+        else:
+            pieces.append(piece)
+    return pieces
+
+
+def _rebalance_tail(chunks, max_chars, min_chars):
+    # 마지막 청크가 너무 짧으면 앞 청크와 합치고, 합쳐서 너무 길면 둘로 다시 나눔
+    if len(chunks) < 2 or len(chunks[-1]) >= min_chars:
+        return chunks
+    combined = chunks[-2] + chunks[-1]
+    if len(combined) <= max_chars:
+        return chunks[:-2] + [combined]
+    cut = len(combined) - min_chars
+    # 두 청크 모두 길이 제한을 지키는 범위에서 가능하면 줄 경계에서 자름
+    line_end = combined.rfind('\n', len(combined) - max_chars, cut)
+    if line_end >= min_chars:
+        cut = line_end + 1
+    return chunks[:-2] + [combined[:cut], combined[cut:]]
+
+
+def _merge(pieces, max_chars, min_chars):
+    # 조각을 순서대로 최대 길이까지 이어 붙임 (경계에서 자른 결과가 min_chars보다 짧아지면 조각 중간에서 자름)
+    chunks = []
+    current = ''
+    for piece in pieces:
+        while piece:
+            room = max_chars - len(current)
+            if len(piece) <= room:
+                current += piece
+                break
+            if current and len(current) >= min_chars:
+                chunks.append(current)
+                current = ''
+                continue
+            current += piece[:room]
+            piece = piece[room:]
+            chunks.append(current)
+            current = ''
+    if current:
+        chunks.append(current)
+    return _rebalance_tail(chunks, max_chars, min_chars)
+
+
+def strip_page_breaks(text):
+    """청크 분할용 PAGE_BREAK 표시를 제거하는 함수 (API로 보내기 전에 사용)"""
+    return text.replace(PAGE_BREAK, '')
+
+
+def split_text(text, max_chars=CHUNK_MAX_CHARS, min_chars=CHUNK_MIN_CHARS):
+    """문서 구조(구분자, 페이지, 제목, 문단) 경계에서 텍스트를 청크로 나누는 함수
+
+    청크를 순서대로 이어 붙이면 원문과 같고, 청크가 둘 이상이면 모든 청크는
+    min_chars 이상 max_chars 이하입니다.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    min_chars = min(min_chars, max_chars // 2)
+    return _merge(_pieces(text, max_chars, 0), max_chars, min_chars)
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import streamlit as st
+
+import api_client
+import extraction_cache
+import instrumentation
+import sse
+from text_chunker import split_text, strip_page_breaks
+from file_preprocessing import (
+    EXTRACTOR_VERSION,
+    PREPROCESS_API_KEY,
+    WORKFLOW_ID,
+    create_document_by_text,
+)
+
+# 작업 상태 저장 디렉터리
+JOB_DIR = os.environ.get('WORKFLOW_JOB_DIR', os.path.join('.cache', 'jobs'))
+
+# 동시에 실행할 워크플로우 작업 수 (프로세스 전체)
+MAX_RUNNING_JOBS = 4
+
+# 큰 문서의 청크를 동시에 실행할 워크플로우 요청 수 (프로세스 전체)
+MAX_CONCURRENT_CHUNKS = 8
+
+# 진행 상황 저장 최소 간격 (초)
+PROGRESS_SAVE_INTERVAL = 1.0
+
+# 이 기간 동안 갱신되지 않은 작업 파일은 삭제
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+# 전체 사용자의 오래된 작업 파일 정리 주기 (초)
+JOB_PRUNE_INTERVAL = 3600
+
+STATUS_LABELS = {
+    'queued': '대기 중',
+    'running': '전처리 중',
+    'uploading': '업로드 중',
+    'succeeded': '완료',
+    'failed': '실패',
+}
+
+ACTIVE_STATUSES = ('queued', 'running', 'uploading')
+
+# 현재 프로세스에서 시작한 작업만 실행 중으로 인정
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+_executor = ThreadPoolExecutor(max_workers=MAX_RUNNING_JOBS, thread_name_prefix='workflow-job')
+_chunk_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CHUNKS, thread_name_prefix='workflow-chunk')
+_store_lock = threading.Lock()
+_last_pruned = 0.0
+
+
+def _user_dir(user):
+    # 사용자별 하위 디렉터리 (사용자 식별자는 해시로 변환해 경로에 사용)
+    return os.path.join(JOB_DIR, hashlib.sha256(user.encode('utf-8')).hexdigest()[:16])
+
+
+def _job_path(user, job_id):
+    return os.path.join(_user_dir(user), f'{job_id}.json')
+
+
+def save_job(job):
+    """작업 상태를 원자적으로 저장하는 함수"""
+    job['updated_at'] = time.time()
+    user_dir = _user_dir(job['user'])
+    with _store_lock:
+        os.makedirs(user_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=user_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, _job_path(job['user'], job['id']))
+
+
+def load_job(user, job_id):
+    """사용자의 저장된 작업 상태를 읽는 함수 (없으면 None)"""
+    try:
+        with open(_job_path(user, job_id), 'r', encoding='utf-8') as f:
+            job = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # 다른(이전) 프로세스에서 실행되던 작업은 재시작으로 중단된 것으로 처리
+    if job['status'] in ACTIVE_STATUSES and job.get('process') != _PROCESS_TOKEN:
+        job['status'] = 'failed'
+        job['error'] = '서버 재시작으로 작업이 중단되었습니다. 다시 업로드해주세요.'
+        save_job(job)
+    return job
+
+
+def prune_jobs(now=None):
+    """보존 기간 동안 갱신되지 않은 전체 사용자의 작업 파일을 삭제하는 함수 (파일 내용은 읽지 않음)"""
+    now = now or time.time()
+    for root, _, file_names in os.walk(JOB_DIR):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            try:
+                if now - os.stat(path).st_mtime > JOB_RETENTION_SECONDS:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def list_jobs(user, limit=10):
+    """사용자의 최근 작업 목록을 최신순으로 반환하는 함수 (해당 사용자의 디렉터리만 조회)"""
+    global _last_pruned
+    now = time.time()
+    if now - _last_pruned > JOB_PRUNE_INTERVAL:
+        _last_pruned = now
+        prune_jobs(now)
+
+    user_dir = _user_dir(user)
+    if not os.path.isdir(user_dir):
+        return []
+    jobs = []
+    for entry in os.scandir(user_dir):
+        if not entry.name.endswith('.json'):
+            continue
+        job = load_job(user, entry.name[:-5])
+        if job is not None:
+            jobs.append(job)
+    jobs.sort(key=lambda job: job['created_at'], reverse=True)
+    return jobs[:limit]
+
+
+def _run_streaming_workflow(job, text, report_nodes=True):
+    # 스트리밍 모드로 워크플로우를 실행하며 노드 진행 상황을 작업 상태에 기록
+    workflow_payload = {
+        'response_mode': 'streaming',
+        'user': job['user'],
+        'inputs': {
+            'text': strip_page_breaks(text)
+        },
+        'workflow_id': WORKFLOW_ID
+    }
+
+    def report_queue(position):
+        job['progress'] = f"요청 대기열 {position}번째" if position else ''
+
+    response = api_client.post(
+        'workflows/run',
+        PREPROCESS_API_KEY,
+        endpoint='workflow_stream',
+        queue_callback=report_queue if report_nodes else None,
+        json=workflow_payload,
+        stream=True
+    )
+    api_client.check_response(response)
+
+    last_saved = 0.0
+    with response:
+        for event, event_json in sse.iter_json_events(response):
+            if event == 'workflow_started':
+                job['workflow_run_id'] = event_json.get('workflow_run_id')
+            elif event == 'node_finished' and report_nodes:
+                job['progress'] = event_json.get('data', {}).get('title', '')
+            elif event == 'workflow_finished':
+                data = event_json.get('data', {})
+                if data.get('status') != 'succeeded':
+                    raise RuntimeError(data.get('error') or f"워크플로우 실패 ({data.get('status')})")
+                return {
+                    'task_id': event_json.get('task_id'),
+                    'workflow_run_id': event_json.get('workflow_run_id'),
+                    'data': data
+                }
+            elif event == sse.ERROR:
+                raise RuntimeError(event_json.get('message', '워크플로우 오류'))
+
+            if report_nodes and time.monotonic() - last_saved > PROGRESS_SAVE_INTERVAL:
+                save_job(job)
+                last_saved = time.monotonic()
+    raise RuntimeError('워크플로우 응답이 완료 이벤트 없이 종료되었습니다.')
+
+
+def _run_chunked_workflow(job, chunks):
+    # 청크별로 워크플로우를 동시에 실행(map)하고 청크별 결과(다운로드 URL)를 원래 순서대로 모음
+    futures = [_chunk_executor.submit(_run_streaming_workflow, job, chunk, False) for chunk in chunks]
+    results = []
+    try:
+        for index, future in enumerate(futures):
+            results.append(future.result())
+            job['progress'] = f"{index + 1}/{len(chunks)} 청크"
+            save_job(job)
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+
+    outputs = [result['data'].get('outputs', {}).get('result') for result in results]
+    return {
+        'task_id': None,
+        'workflow_run_id': None,
+        'data': {
+            'status': 'succeeded',
+            'outputs': {'chunks': outputs},
+            'chunk_count': len(chunks)
+        }
+    }
+
+
+def _run_workflow(job, text):
+    chunks = split_text(text)
+    with instrumentation.span('workflow.run', mode='streaming' if len(chunks) == 1 else 'chunked'):
+        if len(chunks) == 1:
+            return _run_streaming_workflow(job, text)
+        job['chunks'] = len(chunks)
+        return _run_chunked_workflow(job, chunks)
+
+
+def _run_job(job, text):
+    try:
+        cache_kind = f'workflow-{WORKFLOW_ID}'
+        result = extraction_cache.get_result(cache_kind, job['digest'], EXTRACTOR_VERSION)
+        if result is None:
+            job['status'] = 'running'
+            save_job(job)
+            result = _run_workflow(job, text)
+            extraction_cache.put_result(cache_kind, job['digest'], EXTRACTOR_VERSION, result)
+        else:
+            job['cached'] = True
+        job['result'] = result
+
+        job['status'] = 'uploading'
+        save_job(job)
+        job['document'] = create_document_by_text(job['dataset_id'], job['file_name'], text)
+        job['status'] = 'succeeded'
+    except api_client.ApiError as e:
+        job['status'] = 'failed'
+        job['error'] = f"API 요청 실패 (상태 코드: {e.status_code}) {e.text}"
+    except Exception as e:
+        job['status'] = 'failed'
+        job['error'] = str(e)
+    finally:
+        save_job(job)
+
+
+def submit_job(user, dataset_id, file_name, digest, text):
+    """전처리 워크플로우 작업을 등록하고 작업 ID를 반환하는 함수"""
+    job = {
+        'id': uuid.uuid4().hex,
+        'user': user,
+        'dataset_id': dataset_id,
+        'file_name': file_name,
+        'digest': digest,
+        'status': 'queued',
+        'created_at': time.time(),
+        'process': _PROCESS_TOKEN,
+        'error': None,
+    }
+    save_job(job)
+    _executor.submit(_run_job, job, text)
+    return job['id']
+
+
+def _show_result_links(job):
+    # 전처리 결과 다운로드 링크 (청크로 나눈 경우 청크별 링크)
+    outputs = (job.get('result') or {}).get('data', {}).get('outputs', {})
+    urls = [url for url in outputs.get('chunks') or [outputs.get('result')] if isinstance(url, str) and url.startswith('http')]
+    base_name = job['file_name'].rsplit('.', 1)[0]
+    for index, file_url in enumerate(urls, start=1):
+        suffix = f'_{index}' if len(urls) > 1 else ''
+        label = f' ({index}/{len(urls)})' if len(urls) > 1 else ''
+        processed_filename = f'{base_name}_processed{suffix}.txt'
+        st.markdown(f'<a href="{file_url}" download="{processed_filename}" target="_blank">📥 전처리된 파일 다운로드{label}</a>', unsafe_allow_html=True)
+
+
+def show_workflow_jobs(user):
+    """사용자의 전처리 작업 목록과 진행 상황을 표시하는 함수"""
+    jobs = list_jobs(user)
+    if not jobs:
+        return
+
+    st.markdown('<div class="section-title">⚙️ 전처리 작업</div>', unsafe_allow_html=True)
+    for job in jobs:
+        created_at = datetime.fromtimestamp(job['created_at']).strftime('%m-%d %H:%M')
+        label = STATUS_LABELS.get(job['status'], job['status'])
+        if job['status'] == 'running' and job.get('progress'):
+            label += f" · {job['progress']}"
+        if job.get('cached'):
+            label += " (캐시)"
+        st.caption(f"📄 {job['file_name']} — {label} ({created_at})")
+        if job['status'] == 'failed' and job.get('error'):
+            st.caption(f"❌ {job['error']}")
+        elif job['status'] == 'succeeded':
+            _show_result_links(job)
+
+    if any(job['status'] in ACTIVE_STATUSES for job in jobs):
+        if st.button("🔄 작업 상태 새로고침", key="refresh_jobs", use_container_width=True):
+            st.rerun()